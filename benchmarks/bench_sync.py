@@ -0,0 +1,172 @@
+# benchmarks/bench_sync.py
+"""Benchmark the sync pipeline against an in-process fake Kobo server.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/bench_sync.py --submissions 10000 --latency 0.02
+
+Each stage (fetch, parse, duration, insert) is timed separately, followed by
+an end-to-end run of the scheduled job on a fresh database. Throughput is
+reported in records per second, and with --trace-memory the peak Python
+allocation of each stage as well.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+# Configure the application before any of its modules are imported
+_workdir = tempfile.mkdtemp(prefix="kobo_bench_")
+os.environ.setdefault("KOBO_SERVER", "https://kobo.bench")
+os.environ.setdefault("API_TOKEN", "bench")
+os.environ.setdefault("FORM_UID", "bench_form")
+os.environ.setdefault("DB_PATH", os.path.join(_workdir, "interviews.db"))
+os.environ.setdefault("FORMS_FILE", os.path.join(_workdir, "forms.json"))
+os.environ["AUDIT_CACHE_ENABLED"] = "false"  # measure the network path
+os.environ["KOBO_RATE_LIMIT"] = "0"  # measure the pipeline, not the rate limiter
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from fake_kobo import FakeKobo  # noqa: E402
+
+
+async def _stage(
+    results: Dict[str, Any],
+    name: str,
+    records: int,
+    trace_memory: bool,
+    func: Callable,
+    *args: Any,
+) -> Any:
+    if trace_memory:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    value = await func(*args)
+    elapsed = time.perf_counter() - started
+    results[name] = {
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed, 1) if elapsed else None,
+    }
+    if trace_memory:
+        results[name]["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    return value
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import schemas.kobo_schema as schemas
+    from core.database import Base, engine, init_db
+    from core.scheduler import scheduled_job__Get_interview_duration
+    from services.db_ops import get_records_count, insert_new_records
+    from services.kobo import (
+        API_HEADERS,
+        FORM_UID,
+        KOBO_SERVER,
+        close_http_client,
+        get_http_client,
+        get_int_durations,
+        get_with_retry,
+        set_http_client,
+    )
+    from services.parsing import parse_submissions_page, run_cpu, shutdown_executor
+
+    fake = FakeKobo(
+        submissions=args.submissions,
+        page_size=args.page_size,
+        audit_rows=args.audit_rows,
+        latency=args.latency,
+        missing_ratio=args.missing_ratio,
+    )
+    set_http_client(httpx.AsyncClient(transport=fake.transport()))
+    await init_db()
+    if args.trace_memory:
+        tracemalloc.start()
+
+    n = args.submissions
+    results: Dict[str, Any] = {"config": vars(args)}
+    fields = ["_id", "_uuid", "_submission_time", "metadata/enumerator_Id", "_attachments"]
+
+    async def fetch() -> List[bytes]:
+        url = f"{KOBO_SERVER}/api/v2/assets/{FORM_UID}/data/"
+        params: Any = {"format": "json", "fields": json.dumps(fields), "limit": str(args.page_size)}
+        pages = []
+        while url:
+            response = await get_with_retry(get_http_client(), url, params=params, headers=API_HEADERS)
+            response.raise_for_status()
+            pages.append(response.content)
+            url, params = json.loads(response.content).get("next"), None
+        return pages
+
+    async def parse(pages: List[bytes]) -> list:
+        records = []
+        for page in pages:
+            page_records, _, _ = await run_cpu(
+                parse_submissions_page, page, schemas.FormSubmissionInterview
+            )
+            records.extend(page_records)
+        return records
+
+    async def durations(records: list) -> list:
+        values = await get_int_durations(
+            [r.audit_URL for r in records], concurrency=args.concurrency
+        )
+        for record, value in zip(records, values):
+            record.interview_duration = value
+        return records
+
+    async def insert(records: list):
+        return await insert_new_records(schemas.convert_model_to_dict_list(records))
+
+    try:
+        pages = await _stage(results, "fetch", n, args.trace_memory, fetch)
+        records = await _stage(results, "parse", n, args.trace_memory, parse, pages)
+        records = await _stage(results, "duration", n, args.trace_memory, durations, records)
+        await _stage(results, "insert", n, args.trace_memory, insert, records)
+
+        # End to end on a fresh database; re-inserting the same uuids would be skipped
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        fake.requests = {"data": 0, "audit": 0}
+        await _stage(
+            results, "end_to_end", n, args.trace_memory, scheduled_job__Get_interview_duration
+        )
+        results["end_to_end"]["stored"] = await get_records_count()
+        results["end_to_end"]["requests"] = dict(fake.requests)
+    finally:
+        await close_http_client()
+        shutdown_executor()
+
+    results["max_rss_mib"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--audit-rows", type=int, default=200, help="Questions per audit CSV.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per fake request.")
+    parser.add_argument("--missing-ratio", type=float, default=0.0, help="Share of 404 audits.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel audit downloads.")
+    parser.add_argument("--trace-memory", action="store_true", help="Record peak allocations per stage.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for stage in ("fetch", "parse", "duration", "insert", "end_to_end"):
+        print(f"{stage:>10}: " + ", ".join(f"{k}={v}" for k, v in results[stage].items()))
+    print(f"max RSS: {results['max_rss_mib']} MiB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
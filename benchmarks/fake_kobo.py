@@ -0,0 +1,106 @@
+# benchmarks/fake_kobo.py
+import asyncio
+import json
+import random
+from typing import Optional
+from urllib.parse import parse_qs
+
+import httpx
+
+NODE_START = "/aDYFXRVSK37D2AKJAS4AB9/group_introduction/a_1_first_interaction_note"
+NODE_END = "/aDYFXRVSK37D2AKJAS4AB9/group_main/group_interview_quality/interview_quality_note"
+
+
+class FakeKobo:
+    """In-process stand-in for the KoboToolbox data API and audit file server.
+
+    Serves `/api/v2/assets/<form>/data/` pages (honouring `limit`, `start` and
+    an `_id` `$gt` query) and synthetic audit CSVs of a configurable size,
+    with a configurable per-request latency.
+    """
+
+    def __init__(
+        self,
+        submissions: int = 1000,
+        page_size: int = 1000,
+        audit_rows: int = 200,
+        latency: float = 0.0,
+        missing_ratio: float = 0.0,
+        enumerators: int = 50,
+        seed: int = 0,
+    ):
+        self.submissions = submissions
+        self.page_size = page_size
+        self.audit_rows = audit_rows
+        self.latency = latency
+        self.missing_ratio = missing_ratio
+        self.enumerators = enumerators
+        self.seed = seed
+        self.requests = {"data": 0, "audit": 0}
+        self.bytes_sent = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if "/data/" in request.url.path:
+            response = self._data_page(request)
+        else:
+            response = self._audit_file(request)
+        self.bytes_sent += len(response.content)
+        return response
+
+    def _data_page(self, request: httpx.Request) -> httpx.Response:
+        self.requests["data"] += 1
+        params = dict(request.url.params)
+        since_id = json.loads(params["query"])["_id"]["$gt"] if "query" in params else 0
+        start = int(params.get("start", 0))
+        limit = min(int(params.get("limit", self.page_size)), self.page_size)
+        first_id = max(since_id, 0) + 1
+        ids = range(first_id + start, min(first_id + start + limit, self.submissions + 1))
+        results = [self._submission(i) for i in ids]
+        remaining = self.submissions - since_id if since_id < self.submissions else 0
+        next_url: Optional[str] = None
+        if start + limit < remaining:
+            next_url = str(request.url.copy_merge_params({"start": str(start + limit)}))
+        return httpx.Response(
+            200,
+            json={"count": remaining, "next": next_url, "previous": None, "results": results},
+        )
+
+    def _submission(self, i: int) -> dict:
+        return {
+            "_id": i,
+            "_uuid": f"00000000-0000-4000-8000-{i:012d}",
+            "_submission_time": f"2025-01-01T00:00:00.{i % 1000000:06d}",
+            "metadata/enumerator_Id": f"enum_{i % self.enumerators}",
+            "_attachments": [{"filename": f"user/attachments/{i}/audit.csv"}],
+        }
+
+    def _audit_file(self, request: httpx.Request) -> httpx.Response:
+        self.requests["audit"] += 1
+        media_file = parse_qs(request.url.query.decode())["media_file"][0]
+        i = int(media_file.split("/")[-2])
+        rng = random.Random(self.seed * 1_000_003 + i)
+        if rng.random() < self.missing_ratio:
+            return httpx.Response(404)
+        return httpx.Response(200, content=self.audit_csv(rng))
+
+    def audit_csv(self, rng: random.Random) -> bytes:
+        t = 1_700_000_000_000
+        lines = ["event,node,start,end", f"form start,,{t},"]
+        t += rng.randint(1_000, 5_000)
+        lines.append(f"question,{NODE_START},{t},{t + 2_000}")
+        for q in range(self.audit_rows):
+            t += rng.randint(1_000, 30_000)
+            lines.append(f"question,/aDYFXRVSK37D2AKJAS4AB9/group_main/q{q},{t},{t + 1_000}")
+        t += rng.randint(1_000, 30_000)
+        lines.append(f"question,{NODE_END},{t},{t + 5_000}")
+        # Tail after the end node, as real audits have (end screen, saves, exits)
+        for _ in range(self.audit_rows // 4):
+            t += rng.randint(100, 1_000)
+            lines.append(f"form save,,{t},")
+        lines.append(f"form exit,,{t + 1_000},")
+        return ("\n".join(lines) + "\n").encode("utf-8")
@@ -0,0 +1,153 @@
+# cli.py
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from core.config import EXPORT_BATCH_SIZE, RECOMPUTE_BATCH_SIZE
+from services.logger import logger, setup_logger
+
+# Application modules are imported inside the commands, so `--help` and each
+# command only load what they use (no API server, no scheduler).
+
+
+async def _rebuild_summary():
+    from core.database import init_db
+    from services import enumerator_summary
+
+    await init_db()
+    await enumerator_summary.rebuild()
+
+
+async def _sync(args: argparse.Namespace) -> int:
+    from core.database import init_db
+    from core.scheduler import run_form_sync
+    from services.audit_retry import drain_audit_retries
+    from services import lease
+    from services.forms import load_forms
+    from services.kobo import check_kobo_settings, close_http_client
+    from services.parsing import shutdown_executor
+
+    if not check_kobo_settings():
+        return 1
+    forms = [form for form in load_forms() if not args.form or form.form_uid in args.form]
+    if not forms:
+        logger.critical("No registered form to sync.")
+        return 1
+
+    await init_db()
+    # Do not run alongside the scheduler of an API worker holding the lease
+    if not await lease.heartbeat():
+        logger.critical("Another worker holds the scheduler lease; not syncing.")
+        return 1
+    lease_task = asyncio.create_task(lease.keep_lease())
+    try:
+        await asyncio.gather(*(run_form_sync(form) for form in forms))
+        if args.retries:
+            await drain_audit_retries()
+    finally:
+        lease_task.cancel()
+        await asyncio.gather(lease_task, return_exceptions=True)
+        await close_http_client()
+        shutdown_executor()
+    return 0
+
+
+async def _recompute(args: argparse.Namespace):
+    from core.database import init_db
+    from services.kobo import close_http_client
+    from services.parsing import shutdown_executor
+    from services.recompute import recompute_metrics
+
+    await init_db()
+    try:
+        await recompute_metrics(
+            node_start=args.node_start,
+            node_end=args.node_end,
+            batch_size=args.batch_size,
+            enumerator_id=args.enumerator_id,
+            form_uids=args.form,
+        )
+    finally:
+        await close_http_client()
+        shutdown_executor()
+
+
+async def _export(args: argparse.Namespace):
+    from core.database import init_db
+    from schemas.interviews import InterviewFilter
+    from services.export import export_records
+
+    await init_db()
+    filters = InterviewFilter(enumerator_Id=args.enumerator_id, form_uid=args.form_uid)
+    compress = args.gzip and args.format == "csv"
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in export_records(
+            args.format, filters=filters, compress=compress, batch_size=args.batch_size
+        ):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a one-shot or maintenance command without starting the API server."""
+    parser = argparse.ArgumentParser(description="Interview API maintenance commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-summary",
+        help="Rebuild the per-enumerator summary table from the interviews table.",
+    )
+    sync = commands.add_parser(
+        "sync",
+        help="Sync the registered forms once, e.g. from cron, then exit.",
+    )
+    sync.add_argument(
+        "--form", action="append", help="Only sync this form_uid; repeat for several."
+    )
+    sync.add_argument(
+        "--retries", action="store_true", help="Also retry due audit durations."
+    )
+    recompute = commands.add_parser(
+        "recompute",
+        help="Recompute durations and audit metrics of stored interviews from their audit files.",
+    )
+    recompute.add_argument(
+        "--node-start", default=None, help="Start node for every form; each form's own by default."
+    )
+    recompute.add_argument(
+        "--node-end", default=None, help="End node for every form; each form's own by default."
+    )
+    recompute.add_argument("--batch-size", type=int, default=RECOMPUTE_BATCH_SIZE)
+    recompute.add_argument("--enumerator-id", default=None)
+    recompute.add_argument(
+        "--form", action="append", help="Only recompute this form_uid; repeat for several."
+    )
+    export = commands.add_parser(
+        "export",
+        help="Write the interviews table as CSV, Parquet or an Arrow IPC stream.",
+    )
+    export.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv")
+    export.add_argument("--gzip", action="store_true", help="Gzip the output; CSV only.")
+    export.add_argument("--output", "-o", help="Output file; standard output by default.")
+    export.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    export.add_argument("--enumerator-id", default=None)
+    export.add_argument("--form-uid", default=None)
+    args = parser.parse_args(argv)
+
+    setup_logger()
+    if args.command == "rebuild-summary":
+        asyncio.run(_rebuild_summary())
+    elif args.command == "sync":
+        return asyncio.run(_sync(args))
+    elif args.command == "recompute":
+        asyncio.run(_recompute(args))
+    elif args.command == "export":
+        asyncio.run(_export(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
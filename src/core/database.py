@@ -1,21 +1,114 @@
+import os
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
 from services.logger import logger
 
-from .config import DATABASE_URL
+from .config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_PROFILE,
+    DB_VACUUM_FREE_RATIO,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+)
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    future=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 Base = declarative_base()
 
+IS_SQLITE = engine.dialect.name == "sqlite"
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")
+# Head revision in migrations/versions; bump with every new migration
+SCHEMA_VERSION = "0004"
+
+
+if IS_SQLITE and DB_PROFILE == "tuned":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _):
+        """Tune every new SQLite connection.
+
+        WAL lets API readers proceed while the sync job writes; synchronous=NORMAL
+        is durable in WAL mode except against power loss of the last commits.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def _schema_version(connection):
+    """Return the migration revision the database is at, or None if unversioned."""
+    try:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        return None
+
+
+def _run_migrations(connection):
+    """Upgrade the schema to the latest migration on an open connection."""
+    # Imported here: Alembic is only needed when the schema is behind
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
 
 async def init_db():
     try:
+        async with engine.connect() as conn:
+            version = await conn.run_sync(_schema_version)
+        if version == SCHEMA_VERSION:
+            logger.info("Database schema is up to date.")
+            return
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-            logger.info("Database tables created successfully.")
+            # Migrations in migrations/versions own the schema on every backend
+            await conn.run_sync(_run_migrations)
+            logger.info(f"Database schema upgraded from {version} to {SCHEMA_VERSION}.")
     except Exception as e:
-        # Use run_sync to execute the synchronous create_all method in an async context
-        await conn.run_sync(Base.metadata.create_all)
         logger.critical(f"An error occurred during database initialization: {e}")
+
+
+async def run_db_maintenance():
+    """Refresh planner statistics, truncate the WAL and VACUUM when fragmented.
+
+    Meant to run outside working hours: VACUUM and a TRUNCATE checkpoint wait
+    for readers and block writers while they run.
+    """
+    if not IS_SQLITE:
+        return
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("ANALYZE"))
+            await conn.execute(text("PRAGMA optimize"))
+            page_count = (await conn.execute(text("PRAGMA page_count"))).scalar() or 0
+            free_count = (await conn.execute(text("PRAGMA freelist_count"))).scalar() or 0
+            if page_count and free_count / page_count > DB_VACUUM_FREE_RATIO:
+                await conn.execute(text("VACUUM"))
+                logger.info(f"Vacuumed database: {free_count} of {page_count} pages were free.")
+            await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        logger.info("Database maintenance finished.")
+    except Exception as e:
+        logger.error(f"Database maintenance failed: {e}")
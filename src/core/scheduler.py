@@ -1,74 +1,160 @@
 # core/scheduler.py
+import asyncio
+import uuid
+from typing import Optional
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from core.config import DEBUG, DEBUG_SCHEDULER_INTERVAL, TIMEZONE, WORKING_HOURS
+from core.config import (
+    AUDIT_RETRY_INTERVAL,
+    DB_MAINTENANCE_HOUR,
+    DEBUG,
+    DEBUG_SCHEDULER_INTERVAL,
+    FORM_SYNC_CONCURRENCY,
+    TIMEZONE,
+    WORKING_HOURS,
+)
+from core.database import IS_SQLITE, run_db_maintenance
 import schemas.kobo_schema as schemas
-from services.db_ops import get_existing_uuids, insert_new_records
-from services.kobo import fetch_kobo_data, get_int_duration, fetch_submissions
-from services.logger import logger
+from schemas.forms import FormConfig
+from services.audit_retry import drain_audit_retries, schedule_retries
+from services.db_ops import (
+    get_existing_uuids,
+    get_sync_cursor,
+    insert_new_records,
+    set_sync_cursor,
+)
+from services.forms import load_forms
+from services.ingest import fill_durations
+from services.kobo import (
+    FORM_UID,
+    KOBO_SERVER,
+    api_headers,
+    check_kobo_settings,
+    iter_kobo_data,
+)
+from services.lease import leader_only
+from services.logger import logger, request_id_var
+from services.metrics import SYNC_BACKLOG, SYNC_RECORDS_TOTAL
 
+# Bounds how many forms are synced at the same time
+form_sync_slots = asyncio.Semaphore(FORM_SYNC_CONCURRENCY)
 
-async def scheduled_job__Get_interview_duration():
-    logger.info("Scheduled job started.")
 
+async def scheduled_job__Get_interview_duration(form: Optional[FormConfig] = None):
+    if form is None:
+        form = FormConfig(form_uid=FORM_UID)
+    logger.info(f"Scheduled job started for form {form.form_uid}.")
 
-    saved_uuids = await get_existing_uuids()
-    if saved_uuids:
-        logger.info(f"Fetched {len(saved_uuids)} existing UUIDs from the database.")
+    since_id = await get_sync_cursor(form.form_uid)
+    if since_id is not None:
+        logger.info(f"Resuming sync after submission _id {since_id}.")
 
-    fetched = await fetch_kobo_data(
+    new_count = 0
+    async for fetched in iter_kobo_data(
         schema=schemas.FormSubmissionInterview,
-        fields=['metadata/enumerator_Id', '_attachments']
-    )
-    if not fetched:
-        logger.critical("No records to process.")
-        return
-    #    else:
-    #        logger.info(f"Fetched {len(fetched)} records from the external API.")
-
-    if len(saved_uuids) > 0 and len(fetched) > 0:
-        fetched = [r for r in fetched if r.uuid not in saved_uuids]
-    if len(fetched) == 0:
-        logger.info("No new records to process.")
-        return
-
-    for record in fetched:
-        if record.audit_URL:
-            interview_duration = await get_int_duration(record.audit_URL)
-            record.interview_duration = (
-                interview_duration if interview_duration is not None else None
+        fields=['_id', '_uuid', '_submission_time', 'metadata/enumerator_Id', '_attachments'],
+        kobo_server_url=form.kobo_server or KOBO_SERVER,
+        form_id=form.form_uid,
+        headers=api_headers(form.api_token),
+        since_id=since_id,
+    ):
+        if not fetched:
+            continue
+
+        # The cursor already excludes synced submissions; the uuid check skips
+        # records pushed through the webhook or inserted before the cursor existed.
+        # Only this page's uuids are looked up, so memory does not grow with history.
+        saved_uuids = await get_existing_uuids([r.uuid for r in fetched])
+        new_records = [r for r in fetched if r.uuid not in saved_uuids]
+
+        SYNC_BACKLOG.labels(form.form_uid).set(len(new_records))
+        for record in new_records:
+            record.form_uid = form.form_uid
+        await fill_durations(new_records, form)
+
+        if new_records:
+            counts = await insert_new_records(
+                submissions=schemas.convert_model_to_dict_list(new_records)
             )
+            SYNC_BACKLOG.labels(form.form_uid).set(0)
+            if counts["failed"]:
+                logger.error("Sync stopped: page insert failed, cursor not advanced.")
+                return
+            await schedule_retries(form, new_records)
+            new_count += counts["inserted"]
+            SYNC_RECORDS_TOTAL.labels(form.form_uid).inc(counts["inserted"])
+
+        synced = [r for r in fetched if r.submission_id is not None]
+        if synced:
+            last = max(synced, key=lambda r: r.submission_id or 0)
+            await set_sync_cursor(form.form_uid, last.submission_id or 0, last.submission_time)
+
+    if new_count == 0:
+        logger.info(f"No new records to process for form {form.form_uid}.")
+    else:
+        logger.info(f"Sync of form {form.form_uid} finished: {new_count} new records stored.")
+
 
-    await insert_new_records(submissions=schemas.convert_model_to_dict_list(fetched))
+async def run_form_sync(form: FormConfig):
+    """Sync one form once a slot in the bounded form pool is free."""
+    # Jobs run as separate tasks, so the correlation id stays local to this run
+    request_id_var.set(f"sync-{form.form_uid}-{uuid.uuid4().hex[:8]}")
+    async with form_sync_slots:
+        await scheduled_job__Get_interview_duration(form)
 
 
 scheduler = AsyncIOScheduler()
 
 
 def setup_jobs():
-    if DEBUG:
+    check_kobo_settings()
+    forms = load_forms()
+    for form in forms:
+        if DEBUG:
+            trigger = IntervalTrigger(minutes=DEBUG_SCHEDULER_INTERVAL)
+        elif form.schedule:
+            trigger = CronTrigger(timezone=TIMEZONE, **form.schedule)
+        else:
+            trigger = CronTrigger(
+                timezone=TIMEZONE,
+                hour=f'{WORKING_HOURS["start"]}-{WORKING_HOURS["end"]}',
+                minute=0,
+            )
         scheduler.add_job(
-            func=scheduled_job__Get_interview_duration,
-            trigger=IntervalTrigger(minutes=DEBUG_SCHEDULER_INTERVAL),  # Run every 5 minutes
-            id="debug_job",  # Unique ID for the job
+            func=leader_only(run_form_sync),
+            trigger=trigger,
+            args=[form],
+            id=f"sync_{form.form_uid}",  # Unique ID for the job
+            max_instances=1,  # Never overlap runs of the same form
+            coalesce=True,  # Collapse missed runs into one
             replace_existing=False,  # Actually, this is the default behavior
         )
+
+    scheduler.add_job(
+        func=leader_only(drain_audit_retries),
+        trigger=IntervalTrigger(minutes=AUDIT_RETRY_INTERVAL),
+        id="audit_retry",
+        max_instances=1,
+        coalesce=True,
+    )
+
+    if IS_SQLITE:
+        scheduler.add_job(
+            func=leader_only(run_db_maintenance),
+            trigger=CronTrigger(timezone=TIMEZONE, hour=DB_MAINTENANCE_HOUR, minute=0),
+            id="db_maintenance",
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if DEBUG:
         logger.info(
-            f"Scheduler is running in DEBUG mode. Job is set to run every {DEBUG_SCHEDULER_INTERVAL} minutes."
+            f"Scheduler is running in DEBUG mode. {len(forms)} form jobs are set to run every {DEBUG_SCHEDULER_INTERVAL} minutes."
         )
     else:
-        scheduler.add_job(
-            func=scheduled_job__Get_interview_duration,
-            trigger=CronTrigger(
-                timezone=TIMEZONE,
-                hour=f'{WORKING_HOURS["start"]}-{WORKING_HOURS["end"]}',
-                minute=0,
-            ),
-            id="production_job",  # Unique ID for the job
-            replace_existing=False,  # Actually, this is the default behavior
-        )
         logger.info(
-            f"Scheduler is running in PRODUCTION mode. Job is set to run every hour from {WORKING_HOURS['start']} to {WORKING_HOURS['end']}."
+            f"Scheduler is running in PRODUCTION mode with {len(forms)} form jobs, at most {FORM_SYNC_CONCURRENCY} running at once."
         )
@@ -1,27 +1,40 @@
 # main.py
+import asyncio
+import time
+import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime
 from typing import AsyncGenerator, Awaitable, Callable
 
 import httpx
 from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 
 from core.config import PORT
 from core.database import init_db
 from core.scheduler import scheduler, setup_jobs
-from routes import interviews
-from services.logger import logger
+from routes import interviews, webhooks
+from services.ingest import start_ingest_worker, stop_ingest_worker
+from services.kobo import close_http_client
+from services.lease import keep_lease
+from services.parsing import shutdown_executor
+from services.logger import logger, request_id_var, setup_logger
+from services.metrics import HTTP_REQUEST_SECONDS
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
-    # Startup: Initialize database and start scheduler
+    # Startup: Initialize logging and database and start scheduler
+    setup_logger()
     logger.info("Starting up...")
+    lease_task = None
     try:
         await init_db()
+        start_ingest_worker()
+        # Every worker runs the scheduler; jobs only run on the lease holder
+        lease_task = asyncio.create_task(keep_lease())
         setup_jobs()
         scheduler.start()
         yield
@@ -29,11 +42,18 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
         # Shutdown: Stop scheduler
         scheduler.shutdown()
         logger.info("Scheduler shut down")
+        if lease_task is not None:
+            lease_task.cancel()
+            await asyncio.gather(lease_task, return_exceptions=True)
+        await stop_ingest_worker()
+        await close_http_client()
+        shutdown_executor()
 
 
 app = FastAPI(lifespan=lifespan)
 app.title = "Interview API"
 app.include_router(interviews.router, prefix="/api/v1")
+app.include_router(webhooks.router, prefix="/api/v1")
 
 app.add_middleware(
     CORSMiddleware,
@@ -50,6 +70,9 @@ async def log_requests(
 ) -> Response:
     """Middleware to log incoming requests and their execution time.
 
+    Each request gets a correlation id, taken from the `X-Request-ID` header or
+    generated, which is added to its log records and echoed in the response.
+
     Args:
         request: The incoming HTTP request.
         call_next: A callable that takes a Request and returns an awaitable Response.
@@ -57,17 +80,32 @@ async def log_requests(
     Returns:
         The HTTP response after processing the request.
     """
-    print(f"Request: {request.method} {request.url.path}")
-    start_time = datetime.now()
-    response = await call_next(request)
-    end_time = datetime.now()
-    execution_time = (end_time - start_time).total_seconds()
-    logger.info(
-        f"Request: {request.method} {request.url.path} {response.status_code} " +
-        f"from {request.client.host if request.client else 'unknown'} " +
-        f"duration: {execution_time:.3f}s" 
-    )
-    return response
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        execution_time = time.perf_counter() - start_time
+        response.headers["X-Request-ID"] = request_id
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, getattr(route, "path", "unmatched"), str(response.status_code)
+        ).observe(execution_time)
+        logger.info(
+            f"Request: {request.method} {request.url.path} {response.status_code} " +
+            f"from {request.client.host if request.client else 'unknown'} " +
+            f"duration: {execution_time:.3f}s"
+        )
+        return response
+    finally:
+        request_id_var.reset(token)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Expose Prometheus metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 # Specific handler for HTTPException (optional, but good practice)
@@ -0,0 +1,64 @@
+# migrations/env.py
+import asyncio
+
+from alembic import context
+from sqlalchemy.engine import Connection
+
+from core.database import SCHEMA_VERSION, Base, engine
+from models import (  # noqa: F401
+    audit_retry,
+    enumerator_summary,
+    interview_metrics,
+    interviews,
+    scheduler_lease,
+    sync_state,
+)
+
+config = context.config
+target_metadata = Base.metadata
+
+if context.get_head_revision() != SCHEMA_VERSION:
+    # init_db() skips migrations while the database is at SCHEMA_VERSION
+    raise RuntimeError(
+        f"core.database.SCHEMA_VERSION is {SCHEMA_VERSION}, "
+        f"but the head revision is {context.get_head_revision()}."
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL for DATABASE_URL without connecting."""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    # Batch mode lets ALTER-style operations work on SQLite by recreating the table
+    context.configure(
+        connection=connection, target_metadata=target_metadata, render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """Run the migrations on the application's engine, with its connect-time pragmas."""
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # Called by init_db() on a connection it already holds
+    do_run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_async_migrations())
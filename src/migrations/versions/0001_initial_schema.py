@@ -0,0 +1,124 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+Databases created before migrations existed (by `Base.metadata.create_all`)
+already have some or all of these tables, so each table and index is only
+created when missing. A newly created enumerator_summary table is filled
+from the interviews already stored, as it is otherwise only updated on insert.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Default SHORT_INTERVIEW_MINUTES at this revision; with another value, run
+# `cli.py rebuild-summary` after upgrading
+SHORT_INTERVIEW_MINUTES = 15
+
+
+def _create_table(inspector, name, *columns) -> bool:
+    if inspector is None or not inspector.has_table(name):
+        op.create_table(name, *columns)
+        return True
+    return False
+
+
+def _create_index(inspector, name, table, columns):
+    if inspector is None or name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Offline (--sql) runs cannot inspect the database and emit every statement
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+    _create_table(
+        inspector,
+        "intervies",
+        sa.Column("uuid", sa.String(), primary_key=True),
+        sa.Column("enumerator_Id", sa.String(), nullable=True),
+        sa.Column("audit_URL", sa.String(), nullable=True),
+        sa.Column("interview_duration", sa.Float(), nullable=True),
+    )
+    _create_index(inspector, "ix_intervies_uuid", "intervies", ["uuid"])
+    _create_index(inspector, "ix_intervies_enumerator_Id", "intervies", ["enumerator_Id"])
+    _create_index(
+        inspector, "ix_intervies_interview_duration", "intervies", ["interview_duration"]
+    )
+
+    _create_table(
+        inspector,
+        "sync_state",
+        sa.Column("form_uid", sa.String(), primary_key=True),
+        sa.Column("last_submission_id", sa.Integer(), nullable=True),
+        sa.Column("last_submission_time", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    )
+
+    summary_created = _create_table(
+        inspector,
+        "enumerator_summary",
+        sa.Column("enumerator_Id", sa.String(), primary_key=True),
+        sa.Column("interview_count", sa.Integer(), nullable=False),
+        sa.Column("duration_count", sa.Integer(), nullable=False),
+        sa.Column("duration_sum", sa.Float(), nullable=False),
+        sa.Column("duration_sum_sq", sa.Float(), nullable=False),
+        sa.Column("duration_min", sa.Float(), nullable=True),
+        sa.Column("duration_max", sa.Float(), nullable=True),
+        sa.Column("short_count", sa.Integer(), nullable=False),
+    )
+    if summary_created:
+        op.execute(
+            f"""
+            INSERT INTO enumerator_summary (
+                "enumerator_Id", interview_count, duration_count, duration_sum,
+                duration_sum_sq, duration_min, duration_max, short_count
+            )
+            SELECT
+                "enumerator_Id",
+                COUNT(*),
+                COUNT(interview_duration),
+                COALESCE(SUM(interview_duration), 0.0),
+                COALESCE(SUM(interview_duration * interview_duration), 0.0),
+                MIN(interview_duration),
+                MAX(interview_duration),
+                COUNT(CASE WHEN interview_duration < {SHORT_INTERVIEW_MINUTES} THEN 1 END)
+            FROM intervies
+            GROUP BY "enumerator_Id"
+            """
+        )
+
+    _create_table(
+        inspector,
+        "interview_metrics",
+        sa.Column("uuid", sa.String(), primary_key=True),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("total_time", sa.Float(), nullable=True),
+        sa.Column("pause_time", sa.Float(), nullable=True),
+        sa.Column("longest_gap", sa.Float(), nullable=True),
+        sa.Column("section_times", sa.JSON(), nullable=True),
+        sa.Column("computed_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("interview_metrics")
+    op.drop_table("enumerator_summary")
+    op.drop_table("sync_state")
+    op.drop_index("ix_intervies_interview_duration", table_name="intervies")
+    op.drop_index("ix_intervies_enumerator_Id", table_name="intervies")
+    op.drop_index("ix_intervies_uuid", table_name="intervies")
+    op.drop_table("intervies")
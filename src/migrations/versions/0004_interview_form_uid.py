@@ -0,0 +1,32 @@
+"""Interview form_uid
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:00:00.000000
+
+Interviews stored before this revision keep a NULL form_uid.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("intervies", sa.Column("form_uid", sa.String(), nullable=True))
+    op.create_index("ix_intervies_form_uid", "intervies", ["form_uid"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_intervies_form_uid", table_name="intervies")
+    with op.batch_alter_table("intervies") as batch_op:
+        batch_op.drop_column("form_uid")
@@ -0,0 +1,20 @@
+# models/audit_retry.py
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+
+from core.database import Base
+
+
+class AuditRetry(Base):
+    """An interview whose duration could not be computed yet, retried with backoff."""
+
+    __tablename__ = "audit_retry"
+    uuid = Column(String, primary_key=True)
+    form_uid = Column(String, nullable=False)
+    audit_URL = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_retry_at = Column(DateTime, nullable=False)  # UTC
+    last_error = Column(String, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_audit_retry_status_next_retry_at", "status", "next_retry_at"),)
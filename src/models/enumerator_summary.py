@@ -0,0 +1,18 @@
+# models/enumerator_summary.py
+from sqlalchemy import Column, Float, Integer, String
+
+from core.database import Base
+
+
+class EnumeratorSummary(Base):
+    """Running duration aggregates per enumerator, maintained on every insert."""
+
+    __tablename__ = "enumerator_summary"
+    enumerator_Id = Column(String, primary_key=True)
+    interview_count = Column(Integer, nullable=False, default=0)
+    duration_count = Column(Integer, nullable=False, default=0)  # interviews with a duration
+    duration_sum = Column(Float, nullable=False, default=0.0)
+    duration_sum_sq = Column(Float, nullable=False, default=0.0)
+    duration_min = Column(Float, nullable=True)
+    duration_max = Column(Float, nullable=True)
+    short_count = Column(Integer, nullable=False, default=0)  # under SHORT_INTERVIEW_MINUTES
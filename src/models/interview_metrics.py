@@ -0,0 +1,17 @@
+# models/interview_metrics.py
+from sqlalchemy import JSON, Column, DateTime, Float, String, func
+
+from core.database import Base
+
+
+class InterviewMetrics(Base):
+    """Audit-derived metrics of an interview, in minutes; filled by `cli.py recompute`."""
+
+    __tablename__ = "interview_metrics"
+    uuid = Column(String, primary_key=True)
+    duration = Column(Float, nullable=True)
+    total_time = Column(Float, nullable=True)
+    pause_time = Column(Float, nullable=True)  # time spent outside the form
+    longest_gap = Column(Float, nullable=True)  # longest idle gap inside the form
+    section_times = Column(JSON, nullable=True)  # minutes per top-level group
+    computed_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
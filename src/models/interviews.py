@@ -7,6 +7,7 @@ from core.database import Base
 class Interview(Base):
     __tablename__ = "intervies"
     uuid = Column(String, primary_key=True, index=True)
-    enumerator_Id = Column(String)
+    enumerator_Id = Column(String, index=True)
     audit_URL = Column(String, nullable=True)
-    interview_duration = Column(Float, nullable=True)
+    interview_duration = Column(Float, nullable=True, index=True)
+    form_uid = Column(String, nullable=True, index=True)  # NULL for interviews stored before 0004
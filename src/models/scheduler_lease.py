@@ -0,0 +1,14 @@
+# models/scheduler_lease.py
+from sqlalchemy import Column, DateTime, String, func
+
+from core.database import Base
+
+
+class SchedulerLease(Base):
+    """A named lease held by one worker at a time, renewed by heartbeats."""
+
+    __tablename__ = "scheduler_lease"
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)  # host:pid:nonce of the holding worker
+    expires_at = Column(DateTime, nullable=False)  # UTC
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
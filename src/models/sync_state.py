@@ -0,0 +1,14 @@
+# models/sync_state.py
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from core.database import Base
+
+
+class SyncState(Base):
+    """High-water mark of the last synced Kobo submission, one row per form."""
+
+    __tablename__ = "sync_state"
+    form_uid = Column(String, primary_key=True)
+    last_submission_id = Column(Integer, nullable=True)
+    last_submission_time = Column(String, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,19 +1,114 @@
 # api/endpoints.py
-from fastapi import APIRouter
+import json
+from typing import AsyncIterator, Literal, Optional
 
-from services.db_ops import get_all_records, get_records_count
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from schemas.interviews import ExportFormat, InterviewFilter
+from services import enumerator_summary
+from services.response_cache import cached_json
+from services.db_ops import (
+    get_enumerator_stats,
+    get_records_count,
+    get_records_page,
+    stream_records,
+)
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 10000
+
+
+async def _ndjson(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield json.dumps(record).encode("utf-8") + b"\n"
+
+
+async def _json_array(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    separator = b"["
+    async for record in records:
+        yield separator + json.dumps(record).encode("utf-8")
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
 
 @router.get("/interviews")
-async def read_records():
-    """Fetch all interview records."""
-    return await get_all_records()
+async def read_records(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Return records with a uuid after this one."),
+    format: Literal["json", "ndjson"] = "json",
+    filters: InterviewFilter = Depends(),
+):
+    """Fetch interview records ordered by uuid.
+
+    With `limit`, one page is returned and the `X-Next-After` header carries the
+    cursor for the next page. Without it, all records after `after` are streamed.
+    `format=ndjson` streams one JSON object per line. Pages are served from the
+    response cache.
+    """
+    if format == "ndjson":
+        return StreamingResponse(
+            _ndjson(stream_records(after=after, limit=limit, filters=filters)),
+            media_type="application/x-ndjson",
+        )
+    if limit is None:
+        return StreamingResponse(
+            _json_array(stream_records(after=after, filters=filters)),
+            media_type="application/json",
+        )
+
+    return await cached_json(
+        request,
+        lambda: get_records_page(limit=limit, after=after, filters=filters),
+        headers=lambda records: (
+            {"X-Next-After": records[-1]["uuid"]} if len(records) == limit else {}
+        ),
+    )
+
+
+@router.get("/interviews/export")
+async def export_interviews(
+    format: ExportFormat = "csv",
+    gzip: bool = Query(False, description="Gzip the output; CSV only."),
+    filters: InterviewFilter = Depends(),
+):
+    """Download interview records as CSV, Parquet or an Arrow IPC stream.
+
+    The file is streamed in batches from the database, so exporting the whole
+    table uses bounded memory. Parquet and Arrow outputs load directly into
+    pandas, Polars or DuckDB.
+    """
+    # Imported here: pyarrow is only needed by this endpoint
+    from services.export import MEDIA_TYPES, export_filename, export_records
+
+    compress = gzip and format == "csv"
+    filename = export_filename(format, compress)
+    return StreamingResponse(
+        export_records(format, filters=filters, compress=compress),
+        media_type="application/gzip" if compress else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/interviews/stats")
+async def read_stats(request: Request, filters: InterviewFilter = Depends()):
+    """Return interview duration statistics per enumerator."""
+    return await cached_json(request, lambda: get_enumerator_stats(filters))
+
+
+@router.get("/interviews/summary")
+async def read_summary(request: Request, enumerator_Id: Optional[str] = None):
+    """Return running duration aggregates per enumerator from the summary table."""
+    return await cached_json(request, lambda: enumerator_summary.get_summaries(enumerator_Id))
 
 
 @router.get("/interviews/count", status_code=200)
-async def status():
+async def status(request: Request):
     """Return the status of the server."""
-    int_count = await get_records_count()
-    return {"interviews_count": int_count}
+
+    async def count():
+        return {"interviews_count": await get_records_count()}
+
+    return await cached_json(request, count)
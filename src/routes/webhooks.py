@@ -0,0 +1,68 @@
+# routes/webhooks.py
+import secrets
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Body, Header, HTTPException, status
+from pydantic import ValidationError
+
+from core.config import WEBHOOK_TOKEN
+from schemas.forms import FormConfig
+from schemas.kobo_schema import FormSubmissionInterview
+from services.forms import load_forms
+from services.ingest import enqueue
+from services.metrics import WEBHOOK_SUBMISSIONS_TOTAL
+
+router = APIRouter()
+
+# Forms accepted by the webhook, loaded from the registry on first use
+_forms: Optional[Dict[str, FormConfig]] = None
+
+# Fields this service computes itself; never taken from a pushed payload
+_SERVER_FIELDS = ("interview_duration", "form_uid")
+
+
+def _get_form(form_uid: str) -> Optional[FormConfig]:
+    global _forms
+    if _forms is None:
+        _forms = {form.form_uid: form for form in load_forms()}
+    return _forms.get(form_uid)
+
+
+@router.post("/webhooks/kobo/{form_uid}", status_code=status.HTTP_202_ACCEPTED)
+async def receive_submission(
+    form_uid: str,
+    payload: dict = Body(...),
+    x_webhook_token: Optional[str] = Header(None),
+):
+    """Accept a submission pushed by a Kobo REST Service.
+
+    The payload is validated and queued; its audit file is processed in the
+    background. Configure the REST Service to POST JSON to this URL with the
+    `X-Webhook-Token` header. The endpoint is disabled until WEBHOOK_TOKEN is set.
+    """
+    if not WEBHOOK_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Webhook ingestion is disabled; set WEBHOOK_TOKEN to enable it.",
+        )
+    if not secrets.compare_digest(x_webhook_token or "", WEBHOOK_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook token.")
+    form = _get_form(form_uid)
+    if form is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown form {form_uid}.")
+    try:
+        record = FormSubmissionInterview.model_validate(
+            {key: value for key, value in payload.items() if key not in _SERVER_FIELDS}
+        )
+    except ValidationError as e:
+        WEBHOOK_SUBMISSIONS_TOTAL.labels("invalid").inc()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_input=False),
+        )
+    if not enqueue(form, record):
+        WEBHOOK_SUBMISSIONS_TOTAL.labels("rejected").inc()
+        # Kobo retries failed deliveries; the poll picks up the rest
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Queue is full.")
+    WEBHOOK_SUBMISSIONS_TOTAL.labels("queued").inc()
+    return {"queued": record.uuid}
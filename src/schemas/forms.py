@@ -0,0 +1,19 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from core.config import DEFAULT_AUDIT_NODE_END, DEFAULT_AUDIT_NODE_START
+
+
+class FormConfig(BaseModel):
+    """A Kobo form to sync, as listed in the form registry."""
+
+    form_uid: str
+    kobo_server: Optional[str] = None  # Defaults to KOBO_SERVER
+    audit_base_url: Optional[str] = None  # Prefix of the audit file names; defaults to AUDIT_URL
+    api_token: Optional[str] = None  # Token for kobo_server and audit_base_url; defaults to API_TOKEN
+    node_start: str = DEFAULT_AUDIT_NODE_START  # Audit node that starts the interview
+    node_end: str = DEFAULT_AUDIT_NODE_END  # Audit node that ends the interview
+    schedule: Optional[Dict[str, str]] = Field(
+        None, description="CronTrigger fields, e.g. {'hour': '7-22', 'minute': '0'}."
+    )  # Defaults to every hour within WORKING_HOURS
@@ -0,0 +1,18 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class InterviewFilter(BaseModel):
+    """Query filters shared by the interview read endpoints."""
+
+    enumerator_Id: Optional[str] = Field(None, description="Only this enumerator's interviews.")
+    form_uid: Optional[str] = Field(None, description="Only this form's interviews.")
+    min_duration: Optional[float] = Field(None, ge=0, description="Minimum duration in minutes.")
+    max_duration: Optional[float] = Field(None, ge=0, description="Maximum duration in minutes.")
+    missing_duration: Optional[bool] = Field(
+        None, description="True for interviews without a duration, False for those with one."
+    )
+
+
+ExportFormat = Literal["csv", "parquet", "arrow"]
@@ -17,6 +17,15 @@ class FormSubmissionInterview(BaseModel):
     interview_duration: Optional[float] = Field(
         None
     )  # Duration in minutes, could be empty
+    form_uid: Optional[str] = Field(
+        None
+    )  # The registry form the submission was synced for; set before insert
+    submission_id: Optional[int] = Field(
+        None, alias="_id", exclude=True
+    )  # Kobo's incremental submission id, used as the sync cursor
+    submission_time: Optional[str] = Field(
+        None, alias="_submission_time", exclude=True
+    )
 
     @field_validator("audit_URL", mode="before")
     @classmethod
@@ -0,0 +1,171 @@
+# services/audit_cache.py
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Iterator, Optional
+
+from core.config import (
+    AUDIT_CACHE_DIR,
+    AUDIT_CACHE_ENABLED,
+    AUDIT_CACHE_LOW_WATER,
+    AUDIT_CACHE_MAX_BYTES,
+)
+from services.logger import logger
+
+# Files are content-addressed by a hash of their key:
+#   <AUDIT_CACHE_DIR>/results/<hash>.json  - computed durations
+#   <AUDIT_CACHE_DIR>/raw/<hash>.csv.gz    - gzipped audit CSVs (optional)
+# File mtimes track the last access and drive LRU eviction. Eviction scans the
+# whole tree, so once over the limit it frees down to AUDIT_CACHE_LOW_WATER of
+# it, and the following writes do not each trigger another scan.
+
+_cache_bytes: Optional[int] = None  # running total, computed on first write
+_lock = threading.Lock()  # writes run in worker threads
+
+
+def _key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _result_path(audit_url: str, node_start: str, node_end: str, precision: int) -> str:
+    key = _key(audit_url, node_start, node_end, str(precision))
+    return os.path.join(AUDIT_CACHE_DIR, "results", key[:2], f"{key}.json")
+
+
+def _raw_path(audit_url: str) -> str:
+    key = _key(audit_url)
+    return os.path.join(AUDIT_CACHE_DIR, "raw", key[:2], f"{key}.csv.gz")
+
+
+def _iter_cache_files() -> Iterator[os.DirEntry]:
+    stack = [AUDIT_CACHE_DIR]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def _touch(path: str) -> bool:
+    """Mark a cache file as recently used. Returns False if it does not exist."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _write(path: str, data: bytes):
+    global _cache_bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    try:
+        replaced = os.stat(path).st_size  # an overwrite only adds the difference
+    except FileNotFoundError:
+        replaced = 0
+    os.replace(tmp_path, path)
+    with _lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(entry.stat().st_size for entry in _iter_cache_files())
+        else:
+            _cache_bytes += len(data) - replaced
+        if _cache_bytes > AUDIT_CACHE_MAX_BYTES:
+            _evict(int(AUDIT_CACHE_MAX_BYTES * AUDIT_CACHE_LOW_WATER))
+
+
+def evict(max_bytes: int = AUDIT_CACHE_MAX_BYTES) -> int:
+    """Delete least recently used cache files until the cache fits in `max_bytes`.
+    Args:
+        max_bytes (int): The size limit of the cache directory.
+    Returns:
+        int: The number of deleted files.
+    """
+    with _lock:
+        return _evict(max_bytes)
+
+
+def _evict(max_bytes: int) -> int:
+    global _cache_bytes
+    files = [(entry.stat(), entry.path) for entry in _iter_cache_files()]
+    total = sum(stat.st_size for stat, _ in files)
+    deleted = 0
+    for stat, path in sorted(files, key=lambda f: f[0].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= stat.st_size
+        deleted += 1
+    _cache_bytes = total
+    if deleted:
+        logger.info(f"Evicted {deleted} audit cache files ({total} bytes kept).")
+    return deleted
+
+
+def _read_duration(path: str) -> Optional[float]:
+    if not _touch(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["duration"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+async def get_cached_duration(
+    audit_url: str, node_start: str, node_end: str, precision: int
+) -> Optional[float]:
+    """Return a cached interview duration, or None on a cache miss."""
+    if not AUDIT_CACHE_ENABLED:
+        return None
+    path = _result_path(audit_url, node_start, node_end, precision)
+    return await asyncio.to_thread(_read_duration, path)
+
+
+async def store_duration(
+    audit_url: str, node_start: str, node_end: str, precision: int, duration: float
+):
+    """Cache a computed interview duration."""
+    if not AUDIT_CACHE_ENABLED:
+        return
+    path = _result_path(audit_url, node_start, node_end, precision)
+    data = json.dumps({"audit_URL": audit_url, "duration": duration}).encode("utf-8")
+    await asyncio.to_thread(_write, path, data)
+
+
+def _read_raw(path: str) -> Optional[bytes]:
+    if not _touch(path):
+        return None
+    try:
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    except (OSError, EOFError) as e:
+        logger.warning(f"Discarding unreadable cached audit file {path}: {e}")
+        return None
+
+
+async def get_cached_audit(audit_url: str) -> Optional[bytes]:
+    """Return the raw content of a cached audit CSV, or None on a cache miss."""
+    if not AUDIT_CACHE_ENABLED:
+        return None
+    return await asyncio.to_thread(_read_raw, _raw_path(audit_url))
+
+
+async def store_audit(audit_url: str, content: bytes):
+    """Cache the raw content of an audit CSV, gzip-compressed."""
+    if not AUDIT_CACHE_ENABLED:
+        return
+    data = await asyncio.to_thread(gzip.compress, content)
+    await asyncio.to_thread(_write, _raw_path(audit_url), data)
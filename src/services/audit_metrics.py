@@ -0,0 +1,213 @@
+# services/audit_metrics.py
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+
+# Vectorised metrics over many audit CSVs at once. All rows of a batch are
+# concatenated into columnar arrays tagged with their interview index, and
+# every metric is computed with grouped NumPy reductions instead of per-row
+# Python loops. Functions here run in the parse executor: no logging.
+
+ROOT_SECTION = "(root)"
+PAUSE_EVENTS = ("form resume",)  # the gap before these is time spent outside the form
+TIMED_EVENTS = ("question", "group questions")  # events whose start-end counts as section time
+
+# Audit files are small, and batches already run in parallel worker processes
+_READ_OPTIONS = pa_csv.ReadOptions(use_threads=False, block_size=1 << 20)
+_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    include_columns=["event", "node", "start", "end"],
+    include_missing_columns=True,
+    column_types={"event": pa.string(), "node": pa.string(), "start": pa.int64(), "end": pa.int64()},
+)
+
+
+def load_audit_batch(contents: Sequence[Optional[bytes]]) -> pa.Table:
+    """Parse many audit CSVs into one table with an `interview` index column.
+
+    Args:
+        contents: The raw audit CSVs; None or unparsable entries contribute no rows.
+
+    Returns:
+        A table with interview, event, node, start and end columns.
+    """
+    tables = []
+    for i, content in enumerate(contents):
+        if not content:
+            continue
+        try:
+            table = pa_csv.read_csv(
+                BytesIO(content), read_options=_READ_OPTIONS, convert_options=_CONVERT_OPTIONS
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            continue
+        tables.append(
+            table.add_column(0, "interview", pa.array(np.full(table.num_rows, i, dtype=np.int64)))
+        )
+    if not tables:
+        return pa.table(
+            {
+                "interview": pa.array([], pa.int64()),
+                "event": pa.array([], pa.string()),
+                "node": pa.array([], pa.string()),
+                "start": pa.array([], pa.int64()),
+                "end": pa.array([], pa.int64()),
+            }
+        )
+    return pa.concat_tables(tables)
+
+
+def _as_float(column: pa.ChunkedArray) -> np.ndarray:
+    """Convert a nullable integer column to float64 with NaN for nulls."""
+    return column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _first_row(interview: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+    """Return, per interview, the first row where `mask` holds (len(interview) if none)."""
+    rows = np.flatnonzero(mask)
+    first = np.full(n, len(interview), dtype=np.int64)
+    np.minimum.at(first, interview[rows], rows)
+    return first
+
+
+def _values_at(rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Return `values` at the given rows, NaN where a row is out of range."""
+    out = np.full(len(rows), np.nan)
+    found = rows < len(values)
+    out[found] = values[rows[found]]
+    return out
+
+
+def _section_of(node: str) -> str:
+    """Return the top-level group of a node path: /<form>/<section>/.../<question>."""
+    parts = node.split("/")
+    return parts[2] if len(parts) >= 4 else ROOT_SECTION
+
+
+def _sections(node: pa.ChunkedArray) -> tuple:
+    """Encode each row's section; nodes repeat a lot, so only unique nodes are split."""
+    encoded = node.combine_chunks().dictionary_encode()
+    names: List[str] = []
+    codes: Dict[str, int] = {}
+    node_to_section = np.array(
+        [codes.setdefault(_section_of(n), len(codes)) for n in encoded.dictionary.to_pylist()],
+        dtype=np.int64,
+    )
+    names = list(codes)
+    indices = encoded.indices.to_numpy(zero_copy_only=False)
+    return names, node_to_section[indices] if len(node_to_section) else indices
+
+
+def compute_audit_metrics(
+    contents: Sequence[Optional[bytes]],
+    node_start: str,
+    node_end: str,
+    precision: int = 1,
+) -> List[Dict]:
+    """Compute duration and activity metrics for a batch of audit CSVs.
+
+    Metrics, all in minutes:
+        duration: start of `node_start` to end of `node_end`, as `scan_audit_block`.
+        total_time: first to last event timestamp.
+        pause_time: time spent outside the form, before each "form resume".
+        longest_gap: longest idle gap between consecutive events inside the form.
+        section_times: time on questions per top-level group of the form.
+
+    Args:
+        contents: The raw audit CSVs, one per interview.
+        node_start: The node indicating the start of the interview.
+        node_end: The node indicating the end of the interview.
+        precision: The number of decimal places for the results.
+
+    Returns:
+        One dict of metrics per input, in input order; None where not computable.
+    """
+    n = len(contents)
+    table = load_audit_batch(contents)
+    interview = table["interview"].to_numpy()
+    start = _as_float(table["start"])
+    end = _as_float(table["end"])
+    event = table["event"].fill_null("")
+    node = table["node"].fill_null("")
+
+    # Start-to-end duration. As in scan_audit_block, the first end node row
+    # counts, and only if the start node was seen before it.
+    is_start = pc.equal(node, node_start).to_numpy(zero_copy_only=False)
+    is_end = pc.equal(node, node_end).to_numpy(zero_copy_only=False)
+    start_row = _first_row(interview, is_start, n)
+    if node_start == node_end:
+        # The first occurrence is the start; the end is the next one
+        is_end = is_end.copy()
+        is_end[start_row[start_row < len(interview)]] = False
+    end_row = _first_row(interview, is_end, n)
+    duration = _values_at(end_row, end) - _values_at(start_row, start)
+    duration[start_row >= end_row] = np.nan
+
+    # Span of all timestamps
+    last_ts = np.where(np.isnan(end), start, end)
+    first_seen = np.full(n, np.inf)
+    last_seen = np.full(n, -np.inf)
+    valid = ~np.isnan(start)
+    np.minimum.at(first_seen, interview[valid], start[valid])
+    np.maximum.at(last_seen, interview[valid], np.fmax(last_ts, start)[valid])
+    total_time = last_seen - first_seen
+
+    # Gaps between consecutive events of the same interview
+    gap = np.full(len(interview), np.nan)
+    if len(interview) > 1:
+        same = interview[1:] == interview[:-1]
+        gap[1:] = np.where(same, start[1:] - last_ts[:-1], np.nan)
+    is_pause = pc.is_in(event, pa.array(PAUSE_EVENTS)).to_numpy(zero_copy_only=False)
+    has_gap = ~np.isnan(gap)
+    pause_time = np.bincount(
+        interview[has_gap & is_pause], weights=gap[has_gap & is_pause], minlength=n
+    )
+    longest_gap = np.full(n, -np.inf)
+    idle = has_gap & ~is_pause
+    np.maximum.at(longest_gap, interview[idle], np.maximum(gap[idle], 0))
+
+    # Time per section, as a dense (interview x section) matrix
+    section_names, section_idx = _sections(node)
+    timed = pc.is_in(event, pa.array(TIMED_EVENTS)).to_numpy(zero_copy_only=False)
+    timed &= ~np.isnan(end) & valid
+    section_time = np.bincount(
+        interview[timed] * len(section_names) + section_idx[timed],
+        weights=(end - start)[timed],
+        minlength=n * len(section_names),
+    ).reshape(n, len(section_names))
+    section_seen = np.bincount(
+        interview[timed] * len(section_names) + section_idx[timed],
+        minlength=n * len(section_names),
+    ).reshape(n, len(section_names))
+
+    def minutes(value: float) -> Optional[float]:
+        if not np.isfinite(value):
+            return None
+        return round(float(value) / (1000 * 60), precision)
+
+    has_rows = np.bincount(interview[valid], minlength=n) > 0
+    metrics = []
+    for i in range(n):
+        if not has_rows[i]:
+            metrics.append(
+                {"duration": None, "total_time": None, "pause_time": None,
+                 "longest_gap": None, "section_times": {}}
+            )
+            continue
+        metrics.append(
+            {
+                "duration": minutes(duration[i]),
+                "total_time": minutes(total_time[i]),
+                "pause_time": minutes(pause_time[i]),
+                "longest_gap": minutes(longest_gap[i]),
+                "section_times": {
+                    name: minutes(section_time[i, j])
+                    for j, name in enumerate(section_names)
+                    if section_seen[i, j]
+                },
+            }
+        )
+    return metrics
@@ -0,0 +1,130 @@
+# services/audit_retry.py
+import asyncio
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import schemas.kobo_schema as schemas
+from core.config import (
+    AUDIT_CONCURRENCY,
+    AUDIT_RETRY_BASE_DELAY,
+    AUDIT_RETRY_BATCH_SIZE,
+    AUDIT_RETRY_MAX_ATTEMPTS,
+    AUDIT_RETRY_MAX_DELAY,
+)
+from models.audit_retry import AuditRetry
+from schemas.forms import FormConfig
+from services.db_ops import (
+    add_audit_retries,
+    get_due_audit_retries,
+    update_audit_retries,
+    update_durations,
+    utcnow,
+)
+from services.forms import load_forms
+from services.kobo import AUDIT_URL, api_headers, audit_error_var, get_int_duration
+from services.logger import logger
+from services.metrics import AUDIT_RETRIES_TOTAL
+
+# Interviews stored without a duration are queued in the audit_retry table and
+# retried with exponential backoff: audit files often reach the server some
+# minutes after their submission. A success fills interview_duration in place.
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Return the wait before the next try after `attempts` failed attempts."""
+    return timedelta(
+        seconds=min(AUDIT_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), AUDIT_RETRY_MAX_DELAY)
+    )
+
+
+async def schedule_retries(form: FormConfig, records: List[schemas.FormSubmissionInterview]):
+    """Queue the stored records that have an audit file but no duration."""
+    due = utcnow() + retry_delay(0)
+    rows = [
+        {
+            "uuid": r.uuid,
+            "form_uid": form.form_uid,
+            "audit_URL": r.audit_URL,
+            "status": "pending",
+            "attempts": 0,
+            "next_retry_at": due,
+        }
+        for r in records
+        if r.audit_URL and r.interview_duration is None
+    ]
+    if rows:
+        await add_audit_retries(rows)
+        logger.info(f"Queued {len(rows)} interviews of form {form.form_uid} for a duration retry.")
+
+
+async def _retry(job: AuditRetry, form: FormConfig) -> Tuple[Optional[float], Optional[str]]:
+    """Compute the duration of one queued interview and the reason it failed, if any."""
+    audit_error_var.set(None)
+    duration = await get_int_duration(
+        job.audit_URL,
+        headers=api_headers(form.api_token),
+        node_start=form.node_start,
+        node_end=form.node_end,
+        audit_base_url=form.audit_base_url or AUDIT_URL,
+    )
+    return duration, audit_error_var.get()
+
+
+async def drain_audit_retries(
+    limit: int = AUDIT_RETRY_BATCH_SIZE, concurrency: int = AUDIT_CONCURRENCY
+) -> Dict[str, int]:
+    """Retry the due queued interviews concurrently and record the outcomes.
+
+    Args:
+        limit: The maximum number of retries in this pass.
+        concurrency: The maximum number of simultaneous audit downloads.
+    Returns:
+        Dict[str, int]: Counts of "done", "pending" (rescheduled) and "failed" (given up) retries.
+    """
+    counts = {"done": 0, "pending": 0, "failed": 0}
+    now = utcnow()
+    jobs = await get_due_audit_retries(now, limit)
+    if not jobs:
+        return counts
+
+    forms = {form.form_uid: form for form in load_forms()}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(job: AuditRetry):
+        async with semaphore:
+            return await _retry(job, forms.get(job.form_uid) or FormConfig(form_uid=job.form_uid))
+
+    # Each retry runs as its own task, so audit_error_var stays per interview
+    results = await asyncio.gather(*(_bounded(job) for job in jobs))
+
+    durations: Dict[str, Optional[float]] = {}
+    outcomes = []
+    for job, (duration, error) in zip(jobs, results):
+        attempts = job.attempts + 1
+        if duration is not None:
+            durations[job.uuid] = duration
+            status, error, next_retry_at = "done", None, now
+        else:
+            status = "failed" if attempts >= AUDIT_RETRY_MAX_ATTEMPTS else "pending"
+            error = error or "no duration"
+            next_retry_at = now + retry_delay(attempts)
+        counts[status] += 1
+        outcomes.append(
+            {
+                "uuid": job.uuid,
+                "status": status,
+                "attempts": attempts,
+                "next_retry_at": next_retry_at,
+                "last_error": error,
+            }
+        )
+
+    await update_durations(durations)
+    await update_audit_retries(outcomes)
+    for status, count in counts.items():
+        AUDIT_RETRIES_TOTAL.labels(status).inc(count)
+    logger.info(
+        f"Audit retries: {counts['done']} durations recovered, {counts['pending']} rescheduled, "
+        f"{counts['failed']} given up."
+    )
+    return counts
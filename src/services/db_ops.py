@@ -1,12 +1,132 @@
 # services/db_ops.py
-from typing import List
+import sqlite3
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Literal, Optional
 
-from sqlalchemy import func, insert, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import case, column, func, insert, or_, select, table, text, union, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
 
-from core.database import AsyncSessionLocal
+from core.config import PG_COPY_MIN_ROWS
+from core.database import AsyncSessionLocal, engine
+from models.audit_retry import AuditRetry
+from models.interview_metrics import InterviewMetrics
 from models.interviews import Interview
+from models.scheduler_lease import SchedulerLease
+from models.sync_state import SyncState
+from schemas.interviews import InterviewFilter
+from services import enumerator_summary, response_cache
 from services.logger import logger
+from services.metrics import SYNC_STAGE_SECONDS
+
+
+def utcnow() -> datetime:
+    """Return the current time as naive UTC, as stored in DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Columns exposed by the read API, in output order
+RECORD_COLUMNS = (
+    Interview.uuid,
+    Interview.enumerator_Id,
+    Interview.audit_URL,
+    Interview.interview_duration,
+    Interview.form_uid,
+)
+
+
+def _apply_filters(stmt, filters: Optional[InterviewFilter]):
+    """Add the WHERE clauses of an InterviewFilter to a query on Interview."""
+    if filters is None:
+        return stmt
+    if filters.enumerator_Id is not None:
+        stmt = stmt.where(Interview.enumerator_Id == filters.enumerator_Id)
+    if filters.form_uid is not None:
+        stmt = stmt.where(Interview.form_uid == filters.form_uid)
+    if filters.min_duration is not None:
+        stmt = stmt.where(Interview.interview_duration >= filters.min_duration)
+    if filters.max_duration is not None:
+        stmt = stmt.where(Interview.interview_duration <= filters.max_duration)
+    if filters.missing_duration is True:
+        stmt = stmt.where(Interview.interview_duration.is_(None))
+    elif filters.missing_duration is False:
+        stmt = stmt.where(Interview.interview_duration.is_not(None))
+    return stmt
+
+
+def _records_after(
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    filters: Optional[InterviewFilter] = None,
+):
+    """Build a keyset-paginated query for records ordered by uuid."""
+    stmt = _apply_filters(select(*RECORD_COLUMNS), filters).order_by(Interview.uuid)
+    if after is not None:
+        stmt = stmt.where(Interview.uuid > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def get_records_page(
+    limit: int,
+    after: Optional[str] = None,
+    filters: Optional[InterviewFilter] = None,
+) -> List[dict]:
+    """Retrieve one page of records ordered by uuid.
+    Args:
+        limit (int): The maximum number of records to return.
+        after (Optional[str]): Return only records with a uuid greater than this cursor.
+        filters (Optional[InterviewFilter]): Restrict the records returned.
+    Returns:
+        List[dict]: The records of the page.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(_records_after(after, limit, filters))
+        return [dict(row) for row in result.mappings()]
+
+
+async def stream_record_batches(
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    filters: Optional[InterviewFilter] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[List[dict]]:
+    """Stream records ordered by uuid in batches, as fetched from the database.
+    Args:
+        after (Optional[str]): Stream only records with a uuid greater than this cursor.
+        limit (Optional[int]): The maximum number of records to stream.
+        filters (Optional[InterviewFilter]): Restrict the records streamed.
+        batch_size (int): The number of rows fetched from the database at a time.
+    Yields:
+        List[dict]: Up to `batch_size` records at a time.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            _records_after(after, limit, filters).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+
+async def stream_records(
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    filters: Optional[InterviewFilter] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[dict]:
+    """Stream records ordered by uuid without loading them all into memory.
+    Args:
+        after (Optional[str]): Stream only records with a uuid greater than this cursor.
+        limit (Optional[int]): The maximum number of records to stream.
+        filters (Optional[InterviewFilter]): Restrict the records streamed.
+        batch_size (int): The number of rows fetched from the database at a time.
+    Yields:
+        dict: One record at a time.
+    """
+    async for batch in stream_record_batches(after, limit, filters, batch_size):
+        for record in batch:
+            yield record
 
 
 async def get_all_records():
@@ -19,44 +139,455 @@ async def get_all_records():
         return result.scalars().all()
 
 
-async def insert_new_records(submissions: List[dict]):
-    """Insert new records into the Interview table.
+def _max_bind_params(dialect_name: str) -> int:
+    """Return the maximum number of bound parameters in one statement for a dialect."""
+    if dialect_name == "sqlite":
+        # SQLITE_MAX_VARIABLE_NUMBER was raised from 999 in SQLite 3.32.0
+        return 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    return 32767  # PostgreSQL wire protocol limit
+
+
+def _on_conflict(stmt, columns: List[str], on_conflict: str, model=Interview):
+    """Add the dialect's ON CONFLICT clause on the primary key to an INSERT."""
+    keys = [column.key for column in model.__table__.primary_key]
+    if on_conflict == "update":
+        updated = {
+            column: stmt.excluded[column]
+            for column in columns
+            if column not in keys
+        }
+        return stmt.on_conflict_do_update(index_elements=keys, set_=updated)
+    return stmt.on_conflict_do_nothing(index_elements=keys)
+
+
+def _upsert_statement(dialect_name: str, rows: List[dict], on_conflict: str, model=Interview):
+    """Build a multi-row INSERT with the dialect's ON CONFLICT clause on the primary key."""
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(model).values(rows)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(model).values(rows)
+    else:
+        # No portable ON CONFLICT; duplicates fail the chunk instead
+        return insert(model).values(rows)
+    return _on_conflict(stmt, list(rows[0]), on_conflict, model)
+
+
+async def _copy_to_staging(session, rows: List[dict], model=Interview):
+    """COPY rows into a temporary staging table shaped like the model's table.
+
+    The table lives until the end of the session's transaction. Only used on
+    PostgreSQL through asyncpg, whose COPY support is reached via the raw
+    driver connection of the session.
+
+    Returns:
+        The staging table, as a lightweight table clause of the copied columns.
+    """
+    columns = list(rows[0])
+    name = f"{model.__tablename__}_staging"
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {name} "
+            f"(LIKE {model.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    await session.execute(text(f"TRUNCATE {name}"))
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    try:
+        await raw_connection.driver_connection.copy_records_to_table(
+            name,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+    except Exception as e:
+        # asyncpg errors bypass SQLAlchemy; surface them like a failed statement
+        raise SQLAlchemyError(f"COPY into {name} failed: {e}") from e
+    return table(name, *[column(c) for c in columns])
+
+
+def _merge_statement(staging, on_conflict: str, model=Interview):
+    """Build an INSERT ... SELECT from a staging table with ON CONFLICT on the primary key."""
+    columns = [c.name for c in staging.c]
+    keys = [c.key for c in model.__table__.primary_key]
+    # DISTINCT ON the key: a row may be staged twice, which DO UPDATE rejects
+    rows = select(*staging.c).distinct(*[staging.c[key] for key in keys])
+    stmt = postgresql.insert(model).from_select(columns, rows)
+    return _on_conflict(stmt, columns, on_conflict, model)
+
+
+async def _staged_enumerators(session, staging) -> set:
+    """Return the enumerators of staged rows, before and after they are merged."""
+    result = await session.execute(
+        union(
+            select(staging.c.enumerator_Id),
+            select(Interview.enumerator_Id).where(Interview.uuid.in_(select(staging.c.uuid))),
+        )
+    )
+    return set(result.scalars())
+
+
+async def _enumerators_of(session, rows: List[dict]) -> set:
+    """Return the enumerators of the given rows, before and after they are written."""
+    enumerator_ids = {row["enumerator_Id"] for row in rows if "enumerator_Id" in row}
+    result = await session.execute(
+        select(Interview.enumerator_Id).where(Interview.uuid.in_([row["uuid"] for row in rows]))
+    )
+    enumerator_ids.update(result.scalars())
+    return enumerator_ids
+
+
+async def upsert_records(
+    submissions: List[dict],
+    on_conflict: Literal["nothing", "update"] = "nothing",
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Insert records into the Interview table in chunks, tolerating existing uuids.
+
+    Rows are split into chunks that stay under the database's bound-parameter
+    limit. Each chunk runs in its own savepoint, so a failing chunk is rolled
+    back without losing the others. On PostgreSQL with asyncpg, batches of at
+    least PG_COPY_MIN_ROWS are instead loaded in one go with COPY into a
+    staging table and merged with a single INSERT ... SELECT.
+
     Args:
-        submissions (List[dict]): A list of dictionaries representing the records to be inserted.
+        submissions (List[dict]): The records to insert; all with the same keys.
+        on_conflict (str): "nothing" to skip rows whose uuid exists, "update" to overwrite them.
+        chunk_size (Optional[int]): Rows per statement; derived from the parameter limit if None.
+    Returns:
+        Dict[str, int]: Counts of "inserted" (or updated), "skipped" and "failed" rows.
     """
-    async with AsyncSessionLocal() as session:
-        try:
+    counts = {"inserted": 0, "skipped": 0, "failed": 0}
+    if not submissions:
+        return counts
 
-            # Perform a bulk insert
-            await session.execute(
-                insert(Interview).values(submissions)
-                # .using_on_conflict_do_nothing()  # Uncomment if using PostgreSQL with ON CONFLICT DO NOTHING
-            )
+    dialect_name = engine.dialect.name
+    use_copy = (
+        dialect_name == "postgresql"
+        and engine.dialect.driver == "asyncpg"
+        and len(submissions) >= PG_COPY_MIN_ROWS
+    )
+    if use_copy:
+        chunk_size = len(submissions)  # COPY has no bound-parameter limit
+    elif chunk_size is None:
+        chunk_size = max(1, _max_bind_params(dialect_name) // len(submissions[0]))
+
+    # Inserted rows come back via RETURNING and are added to the running
+    # enumerator summary; otherwise the affected enumerators are recomputed.
+    incremental = (
+        on_conflict == "nothing"
+        and dialect_name in ("sqlite", "postgresql")
+        and engine.dialect.insert_returning
+    )
+
+    with SYNC_STAGE_SECONDS.labels("db_insert").time():
+        async with AsyncSessionLocal() as session:
+            for i in range(0, len(submissions), chunk_size):
+                chunk = submissions[i : i + chunk_size]
+                try:
+                    async with session.begin_nested():
+                        if use_copy:
+                            staging = await _copy_to_staging(session, chunk)
+                            stmt = _merge_statement(staging, on_conflict)
+                        else:
+                            stmt = _upsert_statement(dialect_name, chunk, on_conflict)
+                        if incremental:
+                            result = await session.execute(
+                                stmt.returning(Interview.enumerator_Id, Interview.interview_duration)
+                            )
+                            inserted = [tuple(row) for row in result]
+                            written = len(inserted)
+                            await enumerator_summary.add_interviews(session, inserted)
+                        else:
+                            affected = await (
+                                _staged_enumerators(session, staging)
+                                if use_copy
+                                else _enumerators_of(session, chunk)
+                            )
+                            result = await session.execute(stmt)
+                            written = result.rowcount if result.rowcount >= 0 else len(chunk)
+                            await enumerator_summary.refresh(session, affected)
+                    counts["inserted"] += written
+                    counts["skipped"] += len(chunk) - written
+                except SQLAlchemyError as e:
+                    counts["failed"] += len(chunk)
+                    logger.error(f"Error during bulk insert of rows {i}-{i + len(chunk) - 1}: {e}")
             await session.commit()
-            logger.info(f"Inserted {len(submissions)} new records into the database.")
-        except IntegrityError:
-            await session.rollback()
-            logger.warning("IntegrityError occurred during bulk insert.")
-        except Exception as e:
-            await session.rollback()
-            logger.error(f"Error during bulk insert: {str(e)}")
+    if counts["inserted"]:
+        response_cache.bump_version()
+
+    logger.info(
+        f"Bulk insert: {counts['inserted']} inserted, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed."
+    )
+    return counts
+
+
+async def insert_new_records(submissions: List[dict]) -> Dict[str, int]:
+    """Insert new records into the Interview table, skipping uuids that already exist.
+    Args:
+        submissions (List[dict]): A list of dictionaries representing the records to be inserted.
+    Returns:
+        Dict[str, int]: Counts of "inserted", "skipped" and "failed" rows.
+    """
+    return await upsert_records(submissions, on_conflict="nothing")
 
 
-async def get_existing_uuids() -> set:
+async def get_existing_uuids(uuids: Optional[List[str]] = None) -> set:
     """Retrieve existing UUIDs from the database.
+
+    Pass the candidate UUIDs to look them up through the primary key index;
+    memory then depends on the number of candidates, not on the table size.
+
+    Args:
+        uuids (Optional[List[str]]): Only check these UUIDs instead of listing the whole table.
     Returns:
         set: A set of existing UUIDs.
     """
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Interview.uuid))
-        return {row[0] for row in result.fetchall()}
+        if uuids is None:
+            result = await session.execute(select(Interview.uuid))
+            return {row[0] for row in result.fetchall()}
+
+        existing = set()
+        chunk_size = _max_bind_params(engine.dialect.name)
+        for i in range(0, len(uuids), chunk_size):
+            result = await session.execute(
+                select(Interview.uuid).where(Interview.uuid.in_(uuids[i : i + chunk_size]))
+            )
+            existing.update(result.scalars())
+        return existing
 
 
-async def get_records_count() -> int|None:
+async def get_records_count(filters: Optional[InterviewFilter] = None) -> int|None:
     """Get the count of records in the Interview table.
+    Args:
+        filters (Optional[InterviewFilter]): Count only the matching records.
     Returns:
         int: The count of records.
     """
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(func.count()).select_from(Interview))
+        stmt = _apply_filters(select(func.count()).select_from(Interview), filters)
+        result = await session.execute(stmt)
         return result.scalar()
+
+
+async def get_enumerator_stats(filters: Optional[InterviewFilter] = None) -> List[dict]:
+    """Compute interview duration statistics per enumerator in SQL.
+
+    The median averages the two middle values for an even count; p90 uses the
+    nearest-rank method. Both are derived from a window over the rows ordered
+    by duration, which works on SQLite as well as PostgreSQL.
+
+    Args:
+        filters (Optional[InterviewFilter]): Restrict the interviews included.
+    Returns:
+        List[dict]: One dict per enumerator with count, with_duration, mean,
+        median, p90, min and max (durations in minutes).
+    """
+    duration = Interview.interview_duration
+    ranked = _apply_filters(
+        select(
+            Interview.enumerator_Id,
+            duration.label("duration"),
+            func.row_number()
+            .over(partition_by=Interview.enumerator_Id, order_by=duration.asc().nulls_last())
+            .label("rn"),
+            func.count(duration).over(partition_by=Interview.enumerator_Id).label("n"),
+        ),
+        filters,
+    ).subquery()
+
+    n = ranked.c.n
+    stmt = (
+        select(
+            ranked.c.enumerator_Id,
+            func.count().label("count"),
+            func.max(n).label("with_duration"),
+            func.avg(ranked.c.duration).label("mean"),
+            func.avg(
+                case((ranked.c.rn.in_([(n + 1) // 2, (n + 2) // 2]), ranked.c.duration))
+            ).label("median"),
+            func.max(case((ranked.c.rn == (9 * n + 9) // 10, ranked.c.duration))).label("p90"),
+            func.min(ranked.c.duration).label("min"),
+            func.max(ranked.c.duration).label("max"),
+        )
+        .group_by(ranked.c.enumerator_Id)
+        .order_by(ranked.c.enumerator_Id)
+    )
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+
+async def get_sync_cursor(form_uid: str) -> Optional[int]:
+    """Get the `_id` of the last synced submission for a form.
+    Args:
+        form_uid (str): The Kobo form UID.
+    Returns:
+        Optional[int]: The last synced submission `_id`, or None if the form was never synced.
+    """
+    async with AsyncSessionLocal() as session:
+        state = await session.get(SyncState, form_uid)
+        return state.last_submission_id if state else None
+
+
+async def set_sync_cursor(
+    form_uid: str, last_submission_id: int, last_submission_time: Optional[str] = None
+):
+    """Store the high-water mark of the last synced submission for a form.
+    Args:
+        form_uid (str): The Kobo form UID.
+        last_submission_id (int): The `_id` of the last synced submission.
+        last_submission_time (Optional[str]): Its `_submission_time`, kept for reference.
+    """
+    async with AsyncSessionLocal() as session:
+        state = await session.get(SyncState, form_uid)
+        if state is None:
+            state = SyncState(form_uid=form_uid)
+            session.add(state)
+        state.last_submission_id = last_submission_id
+        state.last_submission_time = last_submission_time
+        await session.commit()
+
+
+async def update_durations(
+    durations: Dict[str, Optional[float]], refresh_summary: bool = True
+) -> int:
+    """Set the interview_duration of existing records.
+    Args:
+        durations (Dict[str, Optional[float]]): New durations by uuid.
+        refresh_summary (bool): Recompute the affected enumerator summaries; pass
+            False when the whole summary is rebuilt afterwards.
+    Returns:
+        int: The number of updated records.
+    """
+    if not durations:
+        return 0
+    rows = [{"uuid": uuid, "interview_duration": d} for uuid, d in durations.items()]
+    async with AsyncSessionLocal() as session:
+        if refresh_summary:
+            affected = await _enumerators_of(session, rows)
+        await session.execute(update(Interview), rows)
+        if refresh_summary:
+            await enumerator_summary.refresh(session, affected)
+        await session.commit()
+    response_cache.bump_version()
+    return len(rows)
+
+
+async def save_interview_metrics(metrics: List[dict]):
+    """Insert or replace audit metrics rows, keyed by uuid.
+    Args:
+        metrics (List[dict]): InterviewMetrics rows as dictionaries, all with the same keys.
+    """
+    if not metrics:
+        return
+    dialect_name = engine.dialect.name
+    chunk_size = max(1, _max_bind_params(dialect_name) // len(metrics[0]))
+    async with AsyncSessionLocal() as session:
+        for i in range(0, len(metrics), chunk_size):
+            await session.execute(
+                _upsert_statement(
+                    dialect_name, metrics[i : i + chunk_size], "update", model=InterviewMetrics
+                )
+            )
+        await session.commit()
+
+
+async def add_audit_retries(rows: List[dict]):
+    """Queue interviews for a later duration retry, ignoring uuids already queued.
+    Args:
+        rows (List[dict]): AuditRetry rows as dictionaries, all with the same keys.
+    """
+    if not rows:
+        return
+    dialect_name = engine.dialect.name
+    chunk_size = max(1, _max_bind_params(dialect_name) // len(rows[0]))
+    async with AsyncSessionLocal() as session:
+        for i in range(0, len(rows), chunk_size):
+            await session.execute(
+                _upsert_statement(
+                    dialect_name, rows[i : i + chunk_size], "nothing", model=AuditRetry
+                )
+            )
+        await session.commit()
+
+
+async def get_due_audit_retries(now: datetime, limit: int) -> List[AuditRetry]:
+    """Get pending duration retries whose next attempt is due, oldest first.
+    Args:
+        now (datetime): The current time, naive UTC.
+        limit (int): The maximum number of retries to return.
+    Returns:
+        List[AuditRetry]: The due retries.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(AuditRetry)
+            .where(AuditRetry.status == "pending", AuditRetry.next_retry_at <= now)
+            .order_by(AuditRetry.next_retry_at)
+            .limit(limit)
+        )
+        return list(result.scalars())
+
+
+async def update_audit_retries(rows: List[dict]):
+    """Store the outcome of duration retries.
+    Args:
+        rows (List[dict]): Changed AuditRetry columns by uuid, all with the same keys.
+    """
+    if not rows:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(AuditRetry), rows)
+        await session.commit()
+
+
+async def try_acquire_lease(name: str, holder: str, expires_at: datetime) -> bool:
+    """Take or renew a named lease unless another holder's lease is still valid.
+
+    The conditional UPDATE and the INSERT are atomic on the database, so two
+    workers racing for a free lease cannot both get it.
+
+    Args:
+        name (str): The lease name.
+        holder (str): The id of the worker asking for the lease.
+        expires_at (datetime): When the lease expires without renewal, naive UTC.
+    Returns:
+        bool: True if `holder` now holds the lease.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < utcnow()),
+            )
+            .values(holder=holder, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        acquired = result.rowcount == 1
+        if not acquired:
+            result = await session.execute(
+                _upsert_statement(
+                    engine.dialect.name,
+                    [{"name": name, "holder": holder, "expires_at": expires_at}],
+                    "nothing",
+                    model=SchedulerLease,
+                )
+            )
+            acquired = result.rowcount == 1
+        await session.commit()
+        return acquired
+
+
+async def release_lease(name: str, holder: str):
+    """Expire a named lease now if `holder` holds it, so another worker can take over."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(expires_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
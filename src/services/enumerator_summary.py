@@ -0,0 +1,188 @@
+# services/enumerator_summary.py
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import SHORT_INTERVIEW_MINUTES
+from core.database import AsyncSessionLocal
+from models.enumerator_summary import EnumeratorSummary
+from models.interviews import Interview
+from services.logger import logger
+
+_SUMMARY_COLUMNS = [
+    "enumerator_Id",
+    "interview_count",
+    "duration_count",
+    "duration_sum",
+    "duration_sum_sq",
+    "duration_min",
+    "duration_max",
+    "short_count",
+]
+_ADD_CHUNK_SIZE = 1000  # summary rows per statement, under every bound-parameter limit
+
+
+def _summary_select(enumerator_ids: Optional[List[str]] = None):
+    """Aggregate the interviews table into EnumeratorSummary rows."""
+    duration = Interview.interview_duration
+    stmt = select(
+        Interview.enumerator_Id,
+        func.count(),
+        func.count(duration),
+        func.coalesce(func.sum(duration), 0.0),
+        func.coalesce(func.sum(duration * duration), 0.0),
+        func.min(duration),
+        func.max(duration),
+        func.count(case((duration < SHORT_INTERVIEW_MINUTES, 1))),
+    ).group_by(Interview.enumerator_Id)
+    if enumerator_ids is not None:
+        stmt = stmt.where(Interview.enumerator_Id.in_(enumerator_ids))
+    return stmt
+
+
+def _add_statement(dialect_name: str, rows: List[dict]):
+    """Build an INSERT that adds partial aggregates to existing summary rows in place."""
+    insert_ = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert_(EnumeratorSummary).values(rows)
+    current, added = EnumeratorSummary.__table__.c, stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[current.enumerator_Id],
+        set_={
+            "interview_count": current.interview_count + added.interview_count,
+            "duration_count": current.duration_count + added.duration_count,
+            "duration_sum": current.duration_sum + added.duration_sum,
+            "duration_sum_sq": current.duration_sum_sq + added.duration_sum_sq,
+            "short_count": current.short_count + added.short_count,
+            # A NULL on either side keeps the other value
+            "duration_min": case(
+                (current.duration_min.is_(None), added.duration_min),
+                (added.duration_min < current.duration_min, added.duration_min),
+                else_=current.duration_min,
+            ),
+            "duration_max": case(
+                (current.duration_max.is_(None), added.duration_max),
+                (added.duration_max > current.duration_max, added.duration_max),
+                else_=current.duration_max,
+            ),
+        },
+    )
+
+
+async def add_interviews(
+    session: AsyncSession, interviews: Sequence[Tuple[str, Optional[float]]]
+):
+    """Add newly inserted interviews to the running aggregates.
+
+    Runs in the caller's transaction, so the summary commits or rolls back
+    together with the insert. The aggregates are added by the database in one
+    INSERT ... ON CONFLICT DO UPDATE, so concurrent writers (e.g. the sync and
+    webhook workers of several replicas) never overwrite each other's counts.
+    SQLite and PostgreSQL only; other backends use `refresh`.
+
+    Args:
+        session: The session the interviews were inserted with.
+        interviews: (enumerator_Id, interview_duration) of each inserted row.
+    """
+    if not interviews:
+        return
+    by_enumerator: Dict[str, List[Optional[float]]] = {}
+    for enumerator_id, duration in interviews:
+        by_enumerator.setdefault(enumerator_id, []).append(duration)
+
+    rows = []
+    # Sorted, so concurrent transactions lock the summary rows in the same order
+    for enumerator_id in sorted(by_enumerator, key=lambda e: (e is None, e or "")):
+        known = [d for d in by_enumerator[enumerator_id] if d is not None]
+        rows.append(
+            {
+                "enumerator_Id": enumerator_id,
+                "interview_count": len(by_enumerator[enumerator_id]),
+                "duration_count": len(known),
+                "duration_sum": float(sum(known)),
+                "duration_sum_sq": float(sum(d * d for d in known)),
+                "duration_min": min(known, default=None),
+                "duration_max": max(known, default=None),
+                "short_count": sum(1 for d in known if d < SHORT_INTERVIEW_MINUTES),
+            }
+        )
+    dialect_name = session.get_bind().dialect.name
+    for i in range(0, len(rows), _ADD_CHUNK_SIZE):
+        await session.execute(_add_statement(dialect_name, rows[i : i + _ADD_CHUNK_SIZE]))
+
+
+async def refresh(session: AsyncSession, enumerator_ids: Iterable[str]):
+    """Recompute the aggregates of some enumerators from the interviews table.
+
+    Used when existing interviews change, where running sums cannot be updated.
+
+    Args:
+        session: The session holding the changes.
+        enumerator_ids: The enumerators whose interviews changed.
+    """
+    ids = list(set(enumerator_ids))
+    if not ids:
+        return
+    await session.execute(
+        delete(EnumeratorSummary).where(EnumeratorSummary.enumerator_Id.in_(ids))
+    )
+    await session.execute(
+        insert(EnumeratorSummary).from_select(_SUMMARY_COLUMNS, _summary_select(ids))
+    )
+
+
+async def rebuild() -> int:
+    """Rebuild the whole summary table from the interviews table.
+
+    Needed after backfills that bypass `insert_new_records` or after changing
+    SHORT_INTERVIEW_MINUTES.
+
+    Returns:
+        int: The number of enumerators summarised.
+    """
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(EnumeratorSummary))
+        await session.execute(
+            insert(EnumeratorSummary).from_select(_SUMMARY_COLUMNS, _summary_select())
+        )
+        await session.commit()
+        count = await session.scalar(select(func.count()).select_from(EnumeratorSummary))
+    logger.info(f"Rebuilt enumerator summary for {count} enumerators.")
+    return count or 0
+
+
+async def get_summaries(enumerator_id: Optional[str] = None) -> List[dict]:
+    """Read the per-enumerator summary with derived mean and standard deviation.
+    Args:
+        enumerator_id (Optional[str]): Only return this enumerator's summary.
+    Returns:
+        List[dict]: One dict per enumerator; durations in minutes.
+    """
+    stmt = select(EnumeratorSummary).order_by(EnumeratorSummary.enumerator_Id)
+    if enumerator_id is not None:
+        stmt = stmt.where(EnumeratorSummary.enumerator_Id == enumerator_id)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        summaries = result.scalars().all()
+
+    rows = []
+    for s in summaries:
+        mean = std = None
+        if s.duration_count:
+            mean = s.duration_sum / s.duration_count
+            std = math.sqrt(max(s.duration_sum_sq / s.duration_count - mean * mean, 0.0))
+        rows.append(
+            {
+                "enumerator_Id": s.enumerator_Id,
+                "count": s.interview_count,
+                "with_duration": s.duration_count,
+                "mean": mean,
+                "std": std,
+                "min": s.duration_min,
+                "max": s.duration_max,
+                "short_count": s.short_count,
+            }
+        )
+    return rows
@@ -0,0 +1,108 @@
+# services/export.py
+import gzip
+import io
+from typing import AsyncIterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import csv as pa_csv
+
+from core.config import EXPORT_BATCH_SIZE
+from schemas.interviews import ExportFormat, InterviewFilter
+from services.db_ops import stream_record_batches
+
+# Columnar exports of the interviews table. Rows are fetched in batches,
+# converted to Arrow record batches and written by the format's incremental
+# writer into an in-memory sink that is drained after every batch, so memory
+# stays bounded by one batch whatever the table size.
+
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("uuid", pa.string()),
+        ("enumerator_Id", pa.string()),
+        ("audit_URL", pa.string()),
+        ("interview_duration", pa.float64()),
+        ("form_uid", pa.string()),
+    ]
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _open_writer(format: ExportFormat, sink):
+    if format == "csv":
+        return pa_csv.CSVWriter(sink, EXPORT_SCHEMA)
+    if format == "parquet":
+        return pq.ParquetWriter(sink, EXPORT_SCHEMA, compression="snappy")
+    return pa.ipc.new_stream(sink, EXPORT_SCHEMA)
+
+
+def export_filename(format: ExportFormat, compress: bool = False) -> str:
+    """Return the download file name of an export."""
+    extension = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}[format]
+    return f"interviews.{extension}" + (".gz" if compress else "")
+
+
+async def export_records(
+    format: ExportFormat,
+    filters: Optional[InterviewFilter] = None,
+    compress: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Stream the interviews table as CSV, Parquet or an Arrow IPC stream.
+
+    Args:
+        format: "csv", "parquet" or "arrow".
+        filters: Restrict the records exported.
+        compress: Gzip the output; only meaningful for CSV, as Parquet pages
+            are already compressed.
+        batch_size: Rows per database fetch; also the Parquet row group size.
+    Yields:
+        bytes: Consecutive chunks of the file.
+    """
+    sink = _ChunkSink()
+    gzip_file = gzip.GzipFile(fileobj=sink, mode="wb") if compress else None
+    writer = _open_writer(format, gzip_file or sink)
+    try:
+        async for records in stream_record_batches(filters=filters, batch_size=batch_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(records, schema=EXPORT_SCHEMA))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        # Closing writes the Parquet footer and the Arrow end-of-stream marker
+        writer.close()
+        if gzip_file is not None:
+            gzip_file.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
@@ -0,0 +1,43 @@
+# services/forms.py
+import json
+import os
+from typing import List
+
+from pydantic import TypeAdapter, ValidationError
+
+from core.config import FORMS_FILE
+from schemas.forms import FormConfig
+from services.kobo import FORM_UID
+from services.logger import logger
+
+
+def load_forms(path: str = FORMS_FILE) -> List[FormConfig]:
+    """Load the registry of forms to sync.
+
+    The registry is a JSON list of FormConfig objects. Without a registry file
+    the single form set by the FORM_UID environment variable is synced.
+
+    Args:
+        path: The path of the JSON registry file.
+
+    Returns:
+        The forms to sync; empty if none are configured.
+    """
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                forms = TypeAdapter(List[FormConfig]).validate_python(json.load(f))
+        except (OSError, ValueError, ValidationError) as e:
+            logger.critical(f"Invalid form registry {path}: {e}")
+            return []
+        uids = [form.form_uid for form in forms]
+        if len(set(uids)) != len(uids):
+            logger.critical(f"Duplicate form_uid in form registry {path}.")
+            return []
+        logger.info(f"Loaded {len(forms)} forms from {path}.")
+        return forms
+
+    if FORM_UID:
+        return [FormConfig(form_uid=FORM_UID)]
+    logger.critical(f"No form registry at {path} and FORM_UID is not set.")
+    return []
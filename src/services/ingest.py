@@ -0,0 +1,123 @@
+# services/ingest.py
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import schemas.kobo_schema as schemas
+from core.config import WEBHOOK_BATCH_SIZE, WEBHOOK_BATCH_WAIT, WEBHOOK_QUEUE_SIZE
+from schemas.forms import FormConfig
+from services.audit_retry import schedule_retries
+from services.db_ops import get_existing_uuids, insert_new_records
+from services.kobo import AUDIT_URL, api_headers, get_int_durations
+from services.logger import logger, request_id_var
+from services.metrics import AUDITS_TOTAL, SYNC_RECORDS_TOTAL
+
+# Submissions pushed by the Kobo REST Service wait on an in-process queue and
+# are stored in batches by a background worker. The queue is not durable:
+# whatever is lost on shutdown is picked up by the next scheduled poll, which
+# resumes from the sync cursor and skips uuids already stored.
+
+_queue: Optional["asyncio.Queue[Tuple[FormConfig, schemas.FormSubmissionInterview]]"] = None
+_worker: Optional[asyncio.Task] = None
+
+
+async def fill_durations(records: List[schemas.FormSubmissionInterview], form: FormConfig):
+    """Download the audit files of records and set their interview_duration."""
+    with_audit = [r for r in records if r.audit_URL]
+    AUDITS_TOTAL.labels("skipped").inc(len(records) - len(with_audit))
+    durations = await get_int_durations(
+        [r.audit_URL or "" for r in with_audit],
+        headers=api_headers(form.api_token),
+        node_start=form.node_start,
+        node_end=form.node_end,
+        audit_base_url=form.audit_base_url or AUDIT_URL,
+    )
+    for record, interview_duration in zip(with_audit, durations):
+        record.interview_duration = interview_duration
+
+
+def enqueue(form: FormConfig, record: schemas.FormSubmissionInterview) -> bool:
+    """Queue a pushed submission for background processing.
+    Returns:
+        bool: False if the queue is full or the worker is not running.
+    """
+    if _queue is None:
+        return False
+    try:
+        _queue.put_nowait((form, record))
+    except asyncio.QueueFull:
+        return False
+    return True
+
+
+async def _next_batch() -> List[Tuple[FormConfig, schemas.FormSubmissionInterview]]:
+    """Wait for a submission, then collect more for up to WEBHOOK_BATCH_WAIT seconds."""
+    batch = [await _queue.get()]
+    deadline = time.monotonic() + WEBHOOK_BATCH_WAIT
+    while len(batch) < WEBHOOK_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _store(form: FormConfig, records: List[schemas.FormSubmissionInterview]):
+    """Compute durations for the new records of one form and insert them."""
+    # Kobo retries deliveries; skip resent submissions before downloading audits
+    unique = list({r.uuid: r for r in records}.values())
+    existing = await get_existing_uuids([r.uuid for r in unique])
+    new_records = [r for r in unique if r.uuid not in existing]
+    if not new_records:
+        return
+    for record in new_records:
+        record.form_uid = form.form_uid
+    await fill_durations(new_records, form)
+    counts = await insert_new_records(schemas.convert_model_to_dict_list(new_records))
+    if not counts["failed"]:
+        await schedule_retries(form, new_records)
+    SYNC_RECORDS_TOTAL.labels(form.form_uid).inc(counts["inserted"])
+    logger.info(f"Webhook batch of form {form.form_uid}: {counts['inserted']} new records stored.")
+
+
+async def _run():
+    while True:
+        batch = await _next_batch()
+        request_id_var.set(f"webhook-{uuid.uuid4().hex[:8]}")
+        by_form: Dict[str, Tuple[FormConfig, List[schemas.FormSubmissionInterview]]] = {}
+        for form, record in batch:
+            by_form.setdefault(form.form_uid, (form, []))[1].append(record)
+        for form, records in by_form.values():
+            try:
+                await _store(form, records)
+            except Exception as e:
+                # Not retried here: the next scheduled poll reconciles them
+                logger.error(f"Webhook batch of form {form.form_uid} failed: {e}")
+        for _ in batch:
+            _queue.task_done()
+
+
+def start_ingest_worker():
+    """Create the queue and start the background worker on the running loop."""
+    global _queue, _worker
+    _queue = asyncio.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+    _worker = asyncio.create_task(_run(), name="webhook-ingest")
+
+
+async def stop_ingest_worker():
+    """Stop the worker; submissions still queued are left to the next poll."""
+    global _queue, _worker
+    if _worker is None:
+        return
+    if _queue.qsize():
+        logger.warning(f"Stopping webhook worker with {_queue.qsize()} submissions queued.")
+    _worker.cancel()
+    try:
+        await _worker
+    except asyncio.CancelledError:
+        pass
+    _queue = _worker = None
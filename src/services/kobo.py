@@ -1,27 +1,53 @@
 # services/external.py
-import csv
+import asyncio
+import importlib.util
 import os
 import json
-from io import StringIO
-from typing import List, Dict, Optional, TypeVar, Type, Any
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, List, Dict, Optional, Tuple, TypeVar, Type, Any
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
 import httpx
 
-import schemas.kobo_schema as schemas
+from core.config import (
+    AUDIT_CACHE_RAW,
+    AUDIT_CONCURRENCY,
+    AUDIT_PARSE_BATCH_BYTES,
+    DEFAULT_AUDIT_NODE_END,
+    DEFAULT_AUDIT_NODE_START,
+    HTTP2_ENABLED,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    HTTP_TIMEOUT,
+    KOBO_PAGE_SIZE,
+    KOBO_REVALIDATE_MAX_BYTES,
+    PARSE_EXECUTOR,
+)
+from services import audit_cache
 from services.logger import logger
+from services.metrics import AUDITS_TOTAL, KOBO_REVALIDATIONS_TOTAL, SYNC_STAGE_SECONDS
+from services.parsing import parse_submissions_page, run_cpu, scan_audit_block
+from services.rate_limit import get_limiter, reset_limiters
 
 
-load_dotenv()
-
 KOBO_SERVER = os.getenv("KOBO_SERVER", default="")
 API_TOKEN = os.getenv("API_TOKEN", default="")
 FORM_UID = os.getenv("FORM_UID", default="")
 
-if not KOBO_SERVER or not API_TOKEN or not FORM_UID:
-    logger.critical(
-        "KOBO_SERVER, API_TOKEN, and FORM_UID must be set in the environment variables.")
+
+def check_kobo_settings() -> bool:
+    """Log a critical error unless the Kobo server and API token are configured."""
+    if not KOBO_SERVER or not API_TOKEN:
+        logger.critical(
+            "KOBO_SERVER and API_TOKEN must be set in the environment variables.")
+        return False
+    return True
+
 
 #FORM_SUBMISSIONS_API = f"{KOBO_SERVER}/api/v2/assets/{FORM_UID}/data/?fields=%5B%22metadata/enumerator_Id%22%2C%20%22_attachments%22%5D&format=json"
 
@@ -30,158 +56,487 @@ AUDIT_URL = "https://kobocat.unhcr.org/media/original?media_file="
 API_HEADERS = {"Authorization": f"Token {API_TOKEN}", "Accept": "application/json"}
 
 
-async def fetch_submissions(
-    kobo_server_url: str = KOBO_SERVER,
-    form_id: str = FORM_UID,
-    headers: dict = API_HEADERS,
-    
-    params: Optional[Dict[str, str]] = None,
-) -> list[Dict[str, Any]]:
-    """Fetch all form submissions from external API and parse them into the given schema.
+def api_headers(api_token: Optional[str] = None) -> dict:
+    """Return the request headers for a form's API token, or API_HEADERS without one."""
+    if not api_token:
+        return API_HEADERS
+    return {"Authorization": f"Token {api_token}", "Accept": "application/json"}
+
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Why the last audit handled by the current task gave no duration; read by the retry queue
+audit_error_var: ContextVar[Optional[str]] = ContextVar("audit_error", default=None)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Validators and bodies of revalidated responses by URL, least recently used first
+_revalidation_cache: "OrderedDict[str, Tuple[Dict[str, str], bytes]]" = OrderedDict()
+_revalidation_bytes = 0
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared, connection-pooled HTTP client, creating it on first use.
+
+    All Kobo API and audit requests go through this client so that TCP/TLS
+    connections are reused across requests and scheduler runs. With HTTP/2
+    (when the `h2` package is installed) concurrent requests share connections.
     """
-    try:    
-        url = f"{kobo_server_url}/api/v2/assets/{form_id}/data/"
-        
-        async with httpx.AsyncClient(headers=headers) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            count, _, __, results = response.json().values()
-            logger.info(f"Fetched {count} form submissions")
-            # Parse the results into the given schema
-            return results
-    except httpx.HTTPError as e:
-        logger.error(f"Failed to fetch form submissions: {e}")
-        return []
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=HTTP_TIMEOUT,
+            http2=HTTP2_ENABLED and importlib.util.find_spec("h2") is not None,
+        )
+    return _http_client
+
+
+def set_http_client(client: httpx.AsyncClient):
+    """Replace the shared HTTP client, e.g. with one using a mock transport."""
+    global _http_client
+    _http_client = client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and release its pooled connections."""
+    global _http_client, _revalidation_bytes
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    reset_limiters()
+    _revalidation_cache.clear()
+    _revalidation_bytes = 0
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Return the `Retry-After` delay of a response in seconds, given as seconds or a date."""
+    retry_after = response.headers.get("Retry-After", "").strip()
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Return the delay before the next attempt, honouring `Retry-After` if present."""
+    if response is not None:
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            return retry_after
+    return HTTP_RETRY_BACKOFF * 2**attempt
+
+
+@asynccontextmanager
+async def stream_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    max_retries: int = HTTP_MAX_RETRIES,
+    **kwargs: Any,
+) -> AsyncIterator[httpx.Response]:
+    """Open a streamed GET request, retrying with exponential backoff on 429/5xx and transport errors.
+
+    The body is not read; leaving the context closes the response, so a caller
+    that stops reading early also stops the transfer. Every attempt waits for
+    the host's adaptive rate limiter, which slows down when throttled.
+
+    Args:
+        client: The HTTP client to send the request with.
+        url: The URL to request.
+        max_retries: The number of retries after the first attempt.
+        **kwargs: Extra arguments passed to `client.build_request`.
+
+    Yields:
+        The last response received; the caller is responsible for checking its status.
+
+    Raises:
+        httpx.TransportError: If the last attempt failed without a response.
+    """
+    request = client.build_request("GET", url, **kwargs)
+    limiter = get_limiter(request.url.host)
+    for attempt in range(max_retries + 1):
+        sent_at = await limiter.acquire()
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            delay = _retry_delay(None, attempt)
+            logger.warning(f"{e!r} for {url}, retrying in {delay:.1f}s")
+        else:
+            if response.status_code == 429 or (
+                response.status_code == 503 and "Retry-After" in response.headers
+            ):
+                limiter.on_throttled(_retry_after(response), sent_at)
+            elif response.status_code < 500:
+                limiter.on_success()
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                try:
+                    yield response
+                finally:
+                    await response.aclose()
+                return
+            await response.aclose()
+            delay = _retry_delay(response, attempt)
+            logger.warning(
+                f"HTTP {response.status_code} for {url}, retrying in {delay:.1f}s"
+            )
+        await asyncio.sleep(delay)
+
+
+async def get_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    max_retries: int = HTTP_MAX_RETRIES,
+    revalidate: bool = False,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send a GET request, retrying with exponential backoff on 429/5xx and transport errors.
+
+    With `revalidate`, a response carrying an ETag or Last-Modified header is
+    kept, and the next request for the same URL is made conditional. A 304
+    then returns the kept response without transferring the body again. Kept
+    bodies are bounded by KOBO_REVALIDATE_MAX_BYTES in total.
+
+    Args:
+        client: The HTTP client to send the request with.
+        url: The URL to request.
+        max_retries: The number of retries after the first attempt.
+        revalidate: Send If-None-Match/If-Modified-Since from the last response.
+        **kwargs: Extra arguments passed to `client.build_request`.
+
+    Returns:
+        The last response received, with its body read; the caller is responsible
+        for checking its status.
+
+    Raises:
+        httpx.TransportError: If the last attempt failed without a response.
+    """
+    global _revalidation_bytes
+    key = str(httpx.URL(url, params=kwargs.get("params")))
+    cached = _revalidation_cache.get(key) if revalidate else None
+    if cached is not None:
+        conditional = {}
+        if "etag" in cached[0]:
+            conditional["If-None-Match"] = cached[0]["etag"]
+        if "last-modified" in cached[0]:
+            conditional["If-Modified-Since"] = cached[0]["last-modified"]
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **conditional}
+
+    async with stream_with_retry(client, url, max_retries, **kwargs) as response:
+        await response.aread()
+
+    if cached is not None and response.status_code == 304:
+        KOBO_REVALIDATIONS_TOTAL.labels("not_modified").inc()
+        _revalidation_cache.move_to_end(key)
+        headers, content = cached
+        return httpx.Response(200, headers=headers, content=content, request=response.request)
+    if revalidate and response.status_code == 200:
+        if cached is not None:
+            KOBO_REVALIDATIONS_TOTAL.labels("modified").inc()
+        validators = {
+            name: response.headers[name]
+            for name in ("etag", "last-modified", "content-type")
+            if name in response.headers
+        }
+        if cached is not None:
+            _revalidation_bytes -= len(_revalidation_cache.pop(key)[1])
+        if ("etag" in validators or "last-modified" in validators) and len(
+            response.content
+        ) <= KOBO_REVALIDATE_MAX_BYTES:
+            _revalidation_cache[key] = (validators, response.content)
+            _revalidation_bytes += len(response.content)
+            while _revalidation_bytes > KOBO_REVALIDATE_MAX_BYTES:
+                _revalidation_bytes -= len(_revalidation_cache.popitem(last=False)[1][1])
+    return response
+
 
 # Define a generic type bound to BaseModel
 T = TypeVar("T", bound=BaseModel)
 
-async def fetch_kobo_data(
+async def iter_kobo_data(
     schema: Type[T],
     fields: List[str],
     kobo_server_url: str = KOBO_SERVER,
     form_id: str = FORM_UID,
     headers: dict = API_HEADERS,
-    
     params: Optional[Dict[str, str]] = None,
-) -> List[T]:
-    """Fetch form submissions from external API and parse them into the given schema.
+    since_id: Optional[int] = None,
+    page_size: int = KOBO_PAGE_SIZE,
+) -> AsyncIterator[List[T]]:
+    """Stream form submissions page by page, following the API's `next` links.
+
+    Submissions are requested in ascending `_id` order. When `since_id` is given,
+    only submissions with a greater `_id` are requested via the server-side
+    `query` filter, so an incremental run transfers only new data.
 
     Args:
         schema: The Pydantic model to parse the API response into.
         fields: list of fields to include in the response.
         kobo_server_url: The base URL of the Kobo server.
         form_id: The ID of the form to fetch data for.
-        headers: HTTP headers for the request.  
+        headers: HTTP headers for the request.
         params: Additional query parameters for the request.
+        since_id: The last `_id` already synced, or None for a full sync.
+        page_size: The number of submissions to request per page.
 
-    Returns:
-        A list of instances of the given schema.
+    Yields:
+        One list of schema instances per fetched page.
     """
-    try:    
-        url = f"{kobo_server_url}/api/v2/assets/{form_id}/data/"
-        if not params:
-            params = {"format": "json"}
-        
-        if isinstance(fields, list):
-            if params is None: # the linter to not complain about the params being None
-                params = {}
-            params["fields"] = json.dumps(fields) 
-
-        async with httpx.AsyncClient(headers=headers) as client:
-            response = await client.get(url, params=params)
+    url: Optional[str] = f"{kobo_server_url}/api/v2/assets/{form_id}/data/"
+    params = dict(params) if params else {"format": "json"}
+    if isinstance(fields, list):
+        params["fields"] = json.dumps(fields)
+    if since_id is not None:
+        params["query"] = json.dumps({"_id": {"$gt": since_id}})
+    params["sort"] = json.dumps({"_id": 1})
+    params["limit"] = str(page_size)
+
+    client = get_http_client()
+    try:
+        while url:
+            with SYNC_STAGE_SECONDS.labels("kobo_fetch").time():
+                # Only the first URL, with the cursor query, repeats between
+                # runs; `next` links carry offsets into a result set that moves
+                response = await get_with_retry(
+                    client, url, params=params, headers=headers, revalidate=params is not None
+                )
             response.raise_for_status()
-            results = response.json().get("results", [])
-            logger.info(f"Fetched {len(results)} form submissions")
-            # Parse the results into the given schema
-            return [schema(**item) for item in results]
+            # Decode and validate the page off the event loop
+            with SYNC_STAGE_SECONDS.labels("parse").time():
+                results, next_url, count = await run_cpu(
+                    parse_submissions_page, response.content, schema
+                )
+            logger.info(
+                f"Fetched {len(results)} form submissions "
+                f"({count if count is not None else '?'} matching in total)"
+            )
+            yield results
+            # The `next` link already carries the full query string
+            url = next_url
+            params = None
     except httpx.HTTPError as e:
         logger.error(f"Failed to fetch form submissions: {e}")
-        return []
-
 
-async def fetch_audit_file(audit_url: str, headers: dict) -> Optional[List[Dict[str, str]]]:
-    """Fetch the audit file from the given URL and return parsed CSV data.
 
-    Args:
-        audit_url: The URL of the audit file.
-        headers: HTTP headers for the request.
-
-    Returns:
-        A list of dictionaries representing the rows in the CSV file, or None if an error occurs.
-    """
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url=audit_url, headers=headers)
-            response.raise_for_status()
-            csv_file = StringIO(response.text)
-            return list(csv.DictReader(csv_file))
-    except httpx.HTTPStatusError as e:
+def _log_audit_error(audit_url: str, e: httpx.HTTPError):
+    """Log and count a failed audit file request."""
+    AUDITS_TOTAL.labels("failed").inc()
+    if isinstance(e, httpx.HTTPStatusError):
+        audit_error_var.set(f"HTTP {e.response.status_code}")
         if e.response.status_code == 404:
             logger.error(f"Audit file not found at {audit_url}")
         else:
             logger.error(
                 f"HTTP error occurred while fetching audit data for {audit_url}: {e}"
             )
-    except httpx.HTTPError as e:
+    else:
+        audit_error_var.set(f"{type(e).__name__}: {e}")
         logger.error(f"Failed to fetch audit file from {audit_url}: {e}")
-    return None
 
-def calculate_duration(
-    csv_data: List[Dict[str, str]],
+
+def _duration_minutes(
+    start_ts: Optional[int], end_ts: Optional[int], precision: int
+) -> Optional[float]:
+    """Convert start/end timestamps in milliseconds into a duration in minutes."""
+    if start_ts is not None and end_ts is not None:
+        return round((end_ts - start_ts) / (1000 * 60), precision)
+    else:
+        audit_error_var.set("start or end node not found")
+        logger.warning("Start or end timestamp not found in the CSV data.")
+        return None
+
+
+async def stream_duration(
+    audit_url: str,
+    headers: dict,
     node_start: str,
     node_end: str,
     precision: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> Optional[float]:
-    """Calculate the interview duration from the parsed CSV data.
+    """Stream the audit file and calculate the interview duration while it downloads.
+
+    Each received chunk of whole lines is scanned, and the connection is closed
+    as soon as the end node is found, so the rest of the file is never
+    transferred. With PARSE_EXECUTOR=process, lines are collected into blocks
+    of AUDIT_PARSE_BATCH_BYTES first, as every hand-off pickles its block.
 
     Args:
-        csv_data: A list of dictionaries representing the rows in the CSV file.
+        audit_url: The URL of the audit file.
+        headers: HTTP headers for the request.
         node_start: The node indicating the start of the interview.
         node_end: The node indicating the end of the interview.
         precision: The number of decimal places for the result.
+        client: The HTTP client to use; defaults to the shared pooled client.
 
     Returns:
-        The calculated duration in minutes, or None if the calculation cannot be performed.
+        The calculated duration in minutes, or None if an error occurs.
     """
+    header = None
     start_ts = None
     end_ts = None
-
-    for row in csv_data:
-        if row["node"] == node_start and start_ts is None:
-            start_ts = int(row["start"])
-        elif row["node"] == node_end:
-            end_ts = int(row["end"])
-            break
-
-    if start_ts is not None and end_ts is not None:
-        return round((end_ts - start_ts) / (1000 * 60), precision)
-    else:
-        logger.warning("Start or end timestamp not found in the CSV data.")
+    buffer = bytearray()
+    min_block = AUDIT_PARSE_BATCH_BYTES if PARSE_EXECUTOR == "process" else 1
+    try:
+        with SYNC_STAGE_SECONDS.labels("audit_download").time():
+            async with stream_with_retry(
+                client or get_http_client(), audit_url, headers=headers
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    buffer += chunk
+                    if len(buffer) < min_block:
+                        continue
+                    cut = buffer.rfind(b"\n") + 1
+                    if not cut:
+                        continue
+                    header, start_ts, end_ts = await run_cpu(
+                        scan_audit_block, bytes(buffer[:cut]), header, node_start, node_end, start_ts
+                    )
+                    del buffer[:cut]
+                    if end_ts is not None:
+                        break
+                else:
+                    if buffer:
+                        header, start_ts, end_ts = await run_cpu(
+                            scan_audit_block, bytes(buffer), header, node_start, node_end, start_ts
+                        )
+    except httpx.HTTPError as e:
+        _log_audit_error(audit_url, e)
         return None
 
+    AUDITS_TOTAL.labels("fetched").inc()
+    return _duration_minutes(start_ts, end_ts, precision)
+
 
 async def get_int_duration(
     audit_url: str,
     headers: dict = API_HEADERS,
-    node_start: str = "/aDYFXRVSK37D2AKJAS4AB9/group_introduction/a_1_first_interaction_note",
-    node_end: str = "/aDYFXRVSK37D2AKJAS4AB9/group_main/group_interview_quality/interview_quality_note",
+    node_start: str = DEFAULT_AUDIT_NODE_START,
+    node_end: str = DEFAULT_AUDIT_NODE_END,
     precision: int = 1,
+    audit_base_url: str = AUDIT_URL,
 ) -> Optional[float]:
     """Fetch audit file and calculate interview duration.
 
+    Durations are looked up in the audit cache first; with `AUDIT_CACHE_RAW`
+    the gzipped CSV is cached too, so other node pairs need no download.
+
     Args:
-        audit_url: The URL of the audit file.
+        audit_url: The audit file name, as stored in `audit_URL`.
         headers: HTTP headers for the request.
         node_start: The node indicating the start of the interview.
         node_end: The node indicating the end of the interview.
         precision: The number of decimal places for the result.
+        audit_base_url: The URL prefix the audit file name is appended to.
 
     Returns:
         The calculated duration in minutes, or None if an error occurs.
     """
-    csv_data = await fetch_audit_file(AUDIT_URL + audit_url, headers)
-    if csv_data is not None:
-        return calculate_duration(csv_data, node_start, node_end, precision)
-    return None
\ No newline at end of file
+    duration = await audit_cache.get_cached_duration(
+        audit_url, node_start, node_end, precision
+    )
+    if duration is not None:
+        AUDITS_TOTAL.labels("cached").inc()
+        return duration
+
+    content = await audit_cache.get_cached_audit(audit_url)
+    if content is None and AUDIT_CACHE_RAW:
+        # The whole file is needed for the cache, so it cannot be streamed
+        content = await _download_audit(audit_url, headers, audit_base_url)
+        if content is None:
+            return None
+    if content is not None:
+        duration = await _scan_duration(content, node_start, node_end, precision)
+    else:
+        duration = await stream_duration(
+            audit_base_url + audit_url, headers, node_start, node_end, precision
+        )
+
+    if duration is not None:
+        await audit_cache.store_duration(
+            audit_url, node_start, node_end, precision, duration
+        )
+    return duration
+
+
+async def _download_audit(
+    audit_url: str, headers: dict, audit_base_url: str = AUDIT_URL
+) -> Optional[bytes]:
+    """Download a whole audit file and store it in the audit cache."""
+    try:
+        with SYNC_STAGE_SECONDS.labels("audit_download").time():
+            response = await get_with_retry(
+                get_http_client(), audit_base_url + audit_url, headers=headers
+            )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        _log_audit_error(audit_base_url + audit_url, e)
+        return None
+    AUDITS_TOTAL.labels("fetched").inc()
+    await audit_cache.store_audit(audit_url, response.content)
+    return response.content
+
+
+async def get_audit_content(
+    audit_url: str, headers: dict = API_HEADERS, audit_base_url: str = AUDIT_URL
+) -> Optional[bytes]:
+    """Return the raw audit CSV from the audit cache, downloading and caching it on a miss.
+
+    Args:
+        audit_url: The audit file name, as stored in `audit_URL`.
+        headers: HTTP headers for the request.
+        audit_base_url: The URL prefix the audit file name is appended to.
+
+    Returns:
+        The CSV content, or None if it cannot be downloaded.
+    """
+    content = await audit_cache.get_cached_audit(audit_url)
+    if content is not None:
+        AUDITS_TOTAL.labels("cached").inc()
+        return content
+    return await _download_audit(audit_url, headers, audit_base_url)
+
+
+async def _scan_duration(
+    content: bytes, node_start: str, node_end: str, precision: int
+) -> Optional[float]:
+    """Calculate the interview duration from a whole audit file in the parse executor."""
+    with SYNC_STAGE_SECONDS.labels("parse").time():
+        _, start_ts, end_ts = await run_cpu(
+            scan_audit_block, content, None, node_start, node_end
+        )
+    return _duration_minutes(start_ts, end_ts, precision)
+
+
+async def get_int_durations(
+    audit_urls: List[str],
+    concurrency: int = AUDIT_CONCURRENCY,
+    **kwargs: Any,
+) -> List[Optional[float]]:
+    """Fetch audit files concurrently and calculate interview durations.
+
+    At most `concurrency` audit files are downloaded at the same time.
+
+    Args:
+        audit_urls: The audit file names, as stored in `audit_URL`.
+        concurrency: The maximum number of simultaneous downloads.
+        **kwargs: Extra arguments passed to `get_int_duration`.
+
+    Returns:
+        The durations in minutes, in the same order as `audit_urls`; None where
+        a duration could not be calculated.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(audit_url: str) -> Optional[float]:
+        async with semaphore:
+            return await get_int_duration(audit_url, **kwargs)
+
+    return list(await asyncio.gather(*(_bounded(url) for url in audit_urls)))
@@ -0,0 +1,98 @@
+# services/lease.py
+import asyncio
+import functools
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from core.config import (
+    SCHEDULER_LEASE_ENABLED,
+    SCHEDULER_LEASE_RENEW_INTERVAL,
+    SCHEDULER_LEASE_TTL,
+)
+from services.db_ops import release_lease, try_acquire_lease, utcnow
+from services.logger import logger
+from services.metrics import SCHEDULER_LEADER
+
+# Leader election for the scheduler. Every API worker (and a CLI sync) starts
+# the scheduler, but scheduled jobs only run on the worker holding the
+# "scheduler" lease in the database. The holder renews it every
+# SCHEDULER_LEASE_RENEW_INTERVAL seconds; when it stops, another worker takes
+# over once SCHEDULER_LEASE_TTL has passed. Inserts stay idempotent, so a job
+# still running on a worker that just lost the lease does no harm.
+
+LEASE_NAME = "scheduler"
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+_expires_at: Optional[datetime] = None  # of the lease held by this worker
+
+
+def is_leader() -> bool:
+    """Return True if this worker holds an unexpired scheduler lease."""
+    if not SCHEDULER_LEASE_ENABLED:
+        return True
+    return _expires_at is not None and _expires_at > utcnow()
+
+
+async def heartbeat() -> bool:
+    """Take or renew the scheduler lease.
+    Returns:
+        bool: True if this worker is the leader.
+    """
+    global _expires_at
+    if not SCHEDULER_LEASE_ENABLED:
+        return True
+    was_leader = is_leader()
+    expires_at = utcnow() + timedelta(seconds=SCHEDULER_LEASE_TTL)
+    try:
+        acquired = await try_acquire_lease(LEASE_NAME, HOLDER_ID, expires_at)
+    except Exception as e:
+        # Keep the current lease until it expires; the next heartbeat retries
+        logger.error(f"Scheduler lease heartbeat failed: {e}")
+        return is_leader()
+
+    _expires_at = expires_at if acquired else None
+    if acquired and not was_leader:
+        logger.info(f"Worker {HOLDER_ID} took the scheduler lease.")
+    elif was_leader and not acquired:
+        logger.warning(f"Worker {HOLDER_ID} lost the scheduler lease.")
+    SCHEDULER_LEADER.set(1 if acquired else 0)
+    return acquired
+
+
+async def keep_lease():
+    """Send heartbeats until cancelled, then release the lease if held."""
+    try:
+        while True:
+            await heartbeat()
+            await asyncio.sleep(SCHEDULER_LEASE_RENEW_INTERVAL)
+    finally:
+        await release()
+
+
+async def release():
+    """Give up the scheduler lease so another worker can take over at once."""
+    global _expires_at
+    if not SCHEDULER_LEASE_ENABLED or _expires_at is None:
+        return
+    _expires_at = None
+    SCHEDULER_LEADER.set(0)
+    try:
+        await release_lease(LEASE_NAME, HOLDER_ID)
+        logger.info(f"Worker {HOLDER_ID} released the scheduler lease.")
+    except Exception as e:
+        logger.error(f"Failed to release the scheduler lease: {e}")
+
+
+def leader_only(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a scheduled job so that it is skipped on workers without the lease."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not is_leader():
+            return None
+        return await func(*args, **kwargs)
+
+    return wrapper
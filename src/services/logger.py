@@ -1,13 +1,55 @@
 # utils/logger.py
+import atexit
+import contextvars
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from core.config import LOG_BACKUP_COUNT, LOG_MAX_BYTES
+
+SERVICE_NAME = "interview_durations"
 
 _logger = None
+_listener = None
+
+# Correlation id of the current HTTP request or sync run, added to every record
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current correlation id; runs in the caller's context, before queueing."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
 
 
-def setup_logger(service_name: str) -> logging.Logger:
-    global _logger
+def setup_logger(service_name: str = SERVICE_NAME) -> logging.Logger:
+    """Attach the file and console handlers; call once from each entry point.
+
+    Importing this module has no side effects, so worker processes and tools
+    that import application modules do not create log files or threads.
+    """
+    global _logger, _listener
     if _logger is None:
         # Create log directory if it doesn't exist
         if not os.path.exists("log"):
@@ -15,25 +57,45 @@ def setup_logger(service_name: str) -> logging.Logger:
         # Create a custom logger with a fixed name
         _logger = logging.getLogger(service_name)
         _logger.setLevel(logging.INFO)
-        # Create handlers
+        # Create handlers; they run on the listener thread, off the event loop
         log_file_path = os.path.join("log", f"{service_name}.log")
         handler = RotatingFileHandler(
-            log_file_path, maxBytes=1024 * 1024, backupCount=1, encoding="utf-8"  # 1MB
-        )
-
-        formatter = logging.Formatter(
-            "%(asctime)s,%(levelname)s,%(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            log_file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
         )
-        handler.setFormatter(formatter)
-        _logger.addHandler(handler)
+        handler.setFormatter(JsonFormatter())
 
         # Add console handler
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        _logger.addHandler(console_handler)
+        console_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s,%(levelname)s,%(request_id)s,%(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+
+        # Log calls only enqueue the record; the listener thread does the I/O
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RequestIdFilter())
+        _logger.addHandler(queue_handler)
+        _listener = QueueListener(
+            log_queue, handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(stop_logging)
 
     return _logger
 
 
-logger = setup_logger(service_name="interview_durations")
-__all__ = ["logger"]
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Usable before setup_logger() runs; records then only reach Python's last-resort handler
+logger = logging.getLogger(SERVICE_NAME)
+logger.setLevel(logging.INFO)
+__all__ = ["logger", "request_id_var", "setup_logger"]
@@ -0,0 +1,71 @@
+# services/metrics.py
+from prometheus_client import Counter, Gauge, Histogram
+
+# Prometheus metrics, exposed at /metrics. Label values are kept to small,
+# fixed sets (route templates, stage names) to bound series cardinality.
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency.",
+    ["method", "route", "status"],
+)
+
+SYNC_STAGE_SECONDS = Histogram(
+    "sync_stage_duration_seconds",
+    "Time spent in each sync stage, per call.",
+    ["stage"],  # kobo_fetch, audit_download, parse, db_insert
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+AUDITS_TOTAL = Counter(
+    "audits_total",
+    "Audit files by outcome.",
+    ["result"],  # fetched, cached, failed, skipped
+)
+
+HTTP_RATE_LIMIT = Gauge(
+    "http_rate_limit",
+    "Current request rate allowed towards a Kobo host, per second.",
+    ["host"],
+)
+
+KOBO_REVALIDATIONS_TOTAL = Counter(
+    "kobo_revalidations_total",
+    "Conditional Kobo data requests, by outcome.",
+    ["result"],  # not_modified, modified
+)
+
+SYNC_BACKLOG = Gauge(
+    "sync_backlog",
+    "New submissions of the current page still waiting for durations and insert.",
+    ["form"],
+)
+
+SYNC_RECORDS_TOTAL = Counter(
+    "sync_records_total",
+    "Submissions stored by the sync job.",
+    ["form"],
+)
+
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader",
+    "1 if this worker holds the scheduler lease and runs the scheduled jobs.",
+)
+
+AUDIT_RETRIES_TOTAL = Counter(
+    "audit_retries_total",
+    "Duration retries of queued interviews, by outcome.",
+    ["result"],  # done, pending (rescheduled), failed (given up)
+)
+
+WEBHOOK_SUBMISSIONS_TOTAL = Counter(
+    "webhook_submissions_total",
+    "Submissions pushed to the webhook, by outcome.",
+    ["result"],  # queued, invalid, rejected (queue full)
+)
+
+RESPONSE_CACHE_TOTAL = Counter(
+    "response_cache_total",
+    "Read endpoint responses by cache outcome.",
+    ["result"],  # hit, miss, not_modified
+)
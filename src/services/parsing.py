@@ -0,0 +1,109 @@
+# services/parsing.py
+import asyncio
+import csv
+import json
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import StringIO
+from typing import Any, Callable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from core.config import PARSE_EXECUTOR, PARSE_WORKERS
+
+# CPU-bound parsing runs here instead of on the event loop that serves the API.
+# Threads are the default: every hand-off to a worker process pickles its
+# arguments and result, which costs more than scanning a typical audit file.
+# The functions below may run in worker processes, so they must stay
+# picklable, side-effect free and must not log.
+
+_executor: Optional[Executor] = None
+
+T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
+
+
+def get_executor() -> Optional[Executor]:
+    """Return the shared parse executor, creating it on first use; None runs inline."""
+    global _executor
+    if _executor is None and PARSE_WORKERS > 0:
+        if PARSE_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                # Forking a process that runs threads (aiosqlite, the scheduler) is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        elif PARSE_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=PARSE_WORKERS, thread_name_prefix="parse"
+            )
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the parse workers."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_cpu(func: Callable[..., R], *args: Any) -> R:
+    """Run a CPU-bound function in the parse executor without blocking the event loop."""
+    executor = get_executor()
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def parse_submissions_page(
+    content: bytes, schema: Type[T]
+) -> Tuple[List[T], Optional[str], Optional[int]]:
+    """Decode one page of the Kobo data API and validate its results.
+
+    Args:
+        content: The raw JSON response body.
+        schema: The Pydantic model to parse each submission into.
+
+    Returns:
+        The parsed submissions, the URL of the next page and the total count.
+    """
+    payload = json.loads(content)
+    results = [schema(**item) for item in payload.get("results", [])]
+    return results, payload.get("next"), payload.get("count")
+
+
+def scan_audit_block(
+    block: bytes,
+    header: Optional[List[str]],
+    node_start: str,
+    node_end: str,
+    start_ts: Optional[int] = None,
+) -> Tuple[Optional[List[str]], Optional[int], Optional[int]]:
+    """Scan complete lines of an audit CSV for the start and end node timestamps.
+
+    Large files are scanned block by block: pass the returned header and start
+    timestamp into the call for the next block, until the end is found.
+
+    Args:
+        block: Whole CSV lines; the first block starts with the header row.
+        header: The header returned by the previous block, or None.
+        node_start: The node indicating the start of the interview.
+        node_end: The node indicating the end of the interview.
+        start_ts: The start timestamp found in a previous block, if any.
+
+    Returns:
+        The header, the start timestamp and the end timestamp (None until found).
+    """
+    for values in csv.reader(StringIO(block.decode("utf-8", errors="replace"))):
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        row = dict(zip(header, values))
+        if row.get("node") == node_start and start_ts is None:
+            start_ts = int(row["start"])
+        elif row.get("node") == node_end:
+            return header, start_ts, int(row["end"])
+    return header, start_ts, None
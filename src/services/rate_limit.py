@@ -0,0 +1,121 @@
+# services/rate_limit.py
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from core.config import KOBO_RATE_BURST, KOBO_RATE_LIMIT, KOBO_RATE_MIN
+from services.metrics import HTTP_RATE_LIMIT
+
+# Outgoing requests to each Kobo host draw from a token bucket. The refill
+# rate follows AIMD: a throttled response (429, or 503 with Retry-After)
+# halves it and pauses the host for the Retry-After delay, and every
+# successful response adds back a small step, up to KOBO_RATE_LIMIT. The
+# rate settles just under what the server accepts. Without a KOBO_RATE_LIMIT
+# ceiling, requests are not limited until the first throttled response, which
+# halves the rate measured over the last second. The rate is halved once per
+# congestion event: throttled responses to requests sent before the last
+# decrease only extend the pause.
+
+
+class AdaptiveRateLimiter:
+    """A token bucket whose refill rate adapts to the server's throttling."""
+
+    def __init__(self, name: str, max_rate: float, burst: int, min_rate: float):
+        self.name = name
+        self.max_rate = max_rate if max_rate > 0 else math.inf  # 0: no ceiling
+        self.min_rate = min(min_rate, self.max_rate)
+        self.rate = self.max_rate  # tokens per second
+        self.burst = max(1, burst)
+        self.increase = self.max_rate / 50  # per successful response
+        self._sent: deque = deque()  # send times over the last second while unlimited
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = -math.inf  # monotonic time of the last decrease
+        self._lock = asyncio.Lock()  # waiters take tokens in arrival order
+        HTTP_RATE_LIMIT.labels(name).set(self.rate)
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait until a request may be sent.
+        Returns:
+            float: The monotonic time the request was let through, for `on_throttled`.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if math.isinf(self.rate):
+                    self._sent.append(now)
+                    while self._sent[0] < now - 1:
+                        self._sent.popleft()
+                    return now
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_throttled(self, retry_after: Optional[float] = None, sent_at: Optional[float] = None):
+        """Halve the rate and, with a Retry-After delay, pause the host.
+
+        Args:
+            retry_after: The server's Retry-After delay in seconds, if any.
+            sent_at: When the throttled request was let through by `acquire`. A
+                request sent before the last decrease does not halve the rate again.
+        """
+        now = time.monotonic()
+        if sent_at is not None and sent_at <= self._decreased_at:
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+                self._updated = max(self._updated, self._paused_until)
+            return
+        self._decreased_at = now
+        if math.isinf(self.rate):
+            # Start from half the rate the server just refused
+            recent = sum(1 for sent in self._sent if sent >= now - 1)
+            self._sent.clear()
+            self.rate = max(self.min_rate, recent / 2)
+            if math.isinf(self.increase):
+                self.increase = self.rate / 50
+            self._updated = now
+        else:
+            self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+            # No tokens accrue while paused, so the pause does not end in a burst
+            self._updated = max(self._updated, self._paused_until)
+        HTTP_RATE_LIMIT.labels(self.name).set(self.rate)
+
+    def on_success(self):
+        """Raise the rate by one step towards the configured maximum."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            HTTP_RATE_LIMIT.labels(self.name).set(self.rate)
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_limiter(host: str) -> AdaptiveRateLimiter:
+    """Return the rate limiter of a host, creating it on first use."""
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = AdaptiveRateLimiter(
+            host, KOBO_RATE_LIMIT, KOBO_RATE_BURST, KOBO_RATE_MIN
+        )
+    return limiter
+
+
+def reset_limiters():
+    """Forget the learned rates, e.g. when the HTTP client is closed."""
+    _limiters.clear()
@@ -0,0 +1,141 @@
+# services/recompute.py
+import asyncio
+from typing import List, Optional, Tuple
+
+from core.config import (
+    AUDIT_CONCURRENCY,
+    RECOMPUTE_BATCH_BYTES,
+    RECOMPUTE_BATCH_SIZE,
+)
+from schemas.forms import FormConfig
+from schemas.interviews import InterviewFilter
+from services import enumerator_summary
+from services.audit_metrics import compute_audit_metrics
+from services.db_ops import get_records_page, save_interview_metrics, update_durations
+from services.forms import load_forms
+from services.kobo import AUDIT_URL, api_headers, get_audit_content
+from services.logger import logger
+from services.parsing import run_cpu
+
+
+async def _compute_batch(
+    loaded: List[Tuple[dict, bytes]], node_start: str, node_end: str, precision: int
+):
+    """Compute the metrics of loaded audits in the parse executor and store them."""
+    metrics = await run_cpu(
+        compute_audit_metrics, [c for _, c in loaded], node_start, node_end, precision
+    )
+    await update_durations(
+        {r["uuid"]: m["duration"] for (r, _), m in zip(loaded, metrics)},
+        refresh_summary=False,
+    )
+    await save_interview_metrics(
+        [{"uuid": r["uuid"], **m} for (r, _), m in zip(loaded, metrics)]
+    )
+
+
+async def _recompute_form(
+    form: FormConfig,
+    filters: InterviewFilter,
+    node_start: str,
+    node_end: str,
+    batch_size: int,
+    precision: int,
+    batch_bytes: int,
+) -> int:
+    """Recompute the interviews matching `filters` with the audit server of `form`."""
+    headers = api_headers(form.api_token)
+    audit_base_url = form.audit_base_url or AUDIT_URL
+    loaded: List[Tuple[dict, bytes]] = []
+    loaded_bytes = 0
+    after = None
+    total = 0
+    while True:
+        records = await get_records_page(limit=batch_size, after=after, filters=filters)
+        if not records:
+            break
+        after = records[-1]["uuid"]
+
+        with_audit = [r for r in records if r["audit_URL"]]
+        # Load AUDIT_CONCURRENCY audits at a time, so the byte bound is checked as they arrive
+        for i in range(0, len(with_audit), AUDIT_CONCURRENCY):
+            window = with_audit[i : i + AUDIT_CONCURRENCY]
+            contents = await asyncio.gather(
+                *(get_audit_content(r["audit_URL"], headers, audit_base_url) for r in window)
+            )
+            for record, content in zip(window, contents):
+                if content is not None:
+                    loaded.append((record, content))
+                    loaded_bytes += len(content)
+            is_last = i + AUDIT_CONCURRENCY >= len(with_audit)
+            if loaded and (is_last or loaded_bytes >= batch_bytes):
+                await _compute_batch(loaded, node_start, node_end, precision)
+                total += len(loaded)
+                logger.info(
+                    f"Recomputed {len(loaded)} interviews of form {form.form_uid} ({total} so far)."
+                )
+                loaded = []
+                loaded_bytes = 0
+    return total
+
+
+async def recompute_metrics(
+    node_start: Optional[str] = None,
+    node_end: Optional[str] = None,
+    batch_size: int = RECOMPUTE_BATCH_SIZE,
+    precision: int = 1,
+    enumerator_id: Optional[str] = None,
+    batch_bytes: int = RECOMPUTE_BATCH_BYTES,
+    form_uids: Optional[List[str]] = None,
+) -> int:
+    """Recompute durations and audit metrics for stored interviews, batch by batch.
+
+    Each registered form is recomputed with its own audit nodes, audit server
+    and API token. Interviews stored before their form was recorded are only
+    recomputed when the registry has a single form; otherwise they are skipped.
+
+    Audit CSVs come from the audit cache when present and are downloaded (and
+    cached) otherwise; interviews whose audit cannot be loaded are left as they are.
+    Each batch is computed in one vectorised pass in the parse executor. A batch
+    ends after `batch_size` interviews or once its audits reach `batch_bytes`,
+    so large audit files do not pile up in memory.
+
+    Args:
+        node_start: The start node for every form, instead of each form's own.
+        node_end: The end node for every form, instead of each form's own.
+        batch_size: The number of interviews per batch.
+        precision: The number of decimal places for the results.
+        enumerator_id: Only recompute this enumerator's interviews.
+        batch_bytes: The audit content size at which a batch is computed early.
+        form_uids: Only recompute these registered forms.
+
+    Returns:
+        The number of interviews recomputed.
+    """
+    forms = load_forms()
+    single_form = len(forms) == 1
+    if form_uids:
+        forms = [form for form in forms if form.form_uid in form_uids]
+    total = 0
+    for form in forms:
+        filters = InterviewFilter(
+            enumerator_Id=enumerator_id,
+            # With one form, its interviews include those stored without a form_uid
+            form_uid=None if single_form else form.form_uid,
+        )
+        total += await _recompute_form(
+            form,
+            filters,
+            node_start or form.node_start,
+            node_end or form.node_end,
+            batch_size,
+            precision,
+            batch_bytes,
+        )
+    if not single_form:
+        logger.warning(
+            "Several forms are registered: interviews stored without a form_uid were skipped."
+        )
+
+    await enumerator_summary.rebuild()
+    return total
@@ -0,0 +1,103 @@
+# services/response_cache.py
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from core.config import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+from services.metrics import RESPONSE_CACHE_TOTAL
+
+# Serialized JSON bodies of read endpoints, keyed by path and query string.
+# Entries are tagged with the data version current when they were built; any
+# write through db_ops bumps the version, so stale entries are never served.
+# The TTL bounds staleness for writes made by other processes (CLI, replicas).
+
+
+class _Entry(NamedTuple):
+    version: int
+    expires_at: float
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+
+
+_version = 0
+_entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+
+def bump_version():
+    """Invalidate every cached response; call after the interview data changes."""
+    global _version
+    _version += 1
+
+
+def _cache_key(request: Request) -> str:
+    query = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{query}"
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _response(request: Request, entry: _Entry) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+    if _not_modified(request, entry.etag):
+        RESPONSE_CACHE_TOTAL.labels("not_modified").inc()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_json(
+    request: Request,
+    compute: Callable[[], Awaitable[Any]],
+    headers: Optional[Callable[[Any], Dict[str, str]]] = None,
+) -> Response:
+    """Serve a JSON response from the cache, computing and storing it on a miss.
+
+    Responses carry an ETag; a matching `If-None-Match` gets a 304 without a body.
+
+    Args:
+        request: The incoming request; its path and query string key the entry.
+        compute: Produces the response content on a miss.
+        headers: Derives extra response headers from the content, cached with the body.
+    Returns:
+        Response: The serialized JSON, or a 304.
+    """
+    key = _cache_key(request)
+    entry = _entries.get(key)
+    if (
+        RESPONSE_CACHE_ENABLED
+        and entry is not None
+        and entry.version == _version
+        and entry.expires_at > time.monotonic()
+    ):
+        _entries.move_to_end(key)
+        RESPONSE_CACHE_TOTAL.labels("hit").inc()
+        return _response(request, entry)
+
+    RESPONSE_CACHE_TOTAL.labels("miss").inc()
+    version = _version  # a write during compute leaves the entry already stale
+    content = await compute()
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+    entry = _Entry(
+        version=version,
+        expires_at=time.monotonic() + RESPONSE_CACHE_TTL,
+        body=body,
+        etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        headers=headers(content) if headers else {},
+    )
+    if RESPONSE_CACHE_ENABLED:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > RESPONSE_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return _response(request, entry)
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read when core.config is imported, so point the application
+# at a scratch database before any test module imports it.
+_workdir = tempfile.mkdtemp(prefix="kobo_tests_")
+os.environ["DB_PATH"] = os.path.join(_workdir, "interviews.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.environ['DB_PATH']}"
+os.environ["FORMS_FILE"] = os.path.join(_workdir, "forms.json")
+os.environ["AUDIT_CACHE_DIR"] = os.path.join(_workdir, "cache")
+os.environ["SCHEDULER_LEASE_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def _remove_db_files():
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(os.environ["DB_PATH"] + suffix)
+        except FileNotFoundError:
+            pass
+
+
+@pytest.fixture
+def empty_db():
+    """A missing database file; each test runs on a database of its own."""
+    from core.database import engine
+
+    _remove_db_files()
+    yield os.environ["DB_PATH"]
+    # Pooled connections belong to the test's event loop and its database file
+    asyncio.run(engine.dispose())
+    _remove_db_files()
+
+
+@pytest.fixture
+def db(empty_db):
+    """A database migrated to the current schema."""
+    from core.database import init_db
+
+    asyncio.run(init_db())
+    return empty_db
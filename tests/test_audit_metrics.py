@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+START = "/form/group_intro/start_note"
+END = "/form/group_main/end_note"
+OTHER = ("/form/group_intro/q1", "/form/group_main/q2", "/form/group_main/q3")
+
+
+def _audit(rows):
+    lines = ["event,node,start,end"] + [f"{event},{node},{start},{end}" for event, node, start, end in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _scan_duration(content, node_start=START, node_end=END):
+    from services.parsing import scan_audit_block
+
+    _, start_ts, end_ts = scan_audit_block(content, None, node_start, node_end)
+    if start_ts is None or end_ts is None:
+        return None
+    return round((end_ts - start_ts) / 60000, 1)
+
+
+@pytest.mark.parametrize(
+    "rows, duration",
+    [
+        ([("question", START, 0, 1000), ("question", END, 60000, 600000)], 10.0),
+        # An end node before the start node ends the scan without a duration
+        ([("question", END, 0, 60000), ("question", START, 60000, 120000), ("question", END, 120000, 900000)], None),
+        # Only the first start and the first end after it count
+        (
+            [
+                ("question", START, 0, 1000),
+                ("question", START, 60000, 120000),
+                ("question", END, 120000, 300000),
+                ("question", END, 300000, 900000),
+            ],
+            5.0,
+        ),
+        ([("question", START, 0, 1000)], None),
+        ([], None),
+    ],
+)
+def test_duration_matches_scan(rows, duration):
+    from services.audit_metrics import compute_audit_metrics
+
+    content = _audit(rows)
+    (metrics,) = compute_audit_metrics([content], START, END)
+
+    assert metrics["duration"] == duration == _scan_duration(content)
+
+
+def test_same_start_and_end_node_uses_next_occurrence():
+    from services.audit_metrics import compute_audit_metrics
+
+    content = _audit([("question", START, 0, 1000), ("question", START, 120000, 180000)])
+    (metrics,) = compute_audit_metrics([content], START, START)
+
+    assert metrics["duration"] == 3.0 == _scan_duration(content, START, START)
+
+
+def test_batch_of_random_audits_matches_scan():
+    from services.audit_metrics import compute_audit_metrics
+
+    rng = random.Random(0)
+    contents = []
+    for _ in range(500):
+        rows, ts = [], 0
+        for _ in range(rng.randint(0, 12)):
+            node = rng.choice((START, END) + OTHER)
+            rows.append(("question", node, ts, ts + rng.randint(1000, 90000)))
+            ts = rows[-1][3] + rng.randint(0, 30000)
+        contents.append(_audit(rows))
+    contents.append(None)
+
+    metrics = compute_audit_metrics(contents, START, END)
+
+    assert [m["duration"] for m in metrics[:-1]] == [_scan_duration(c) for c in contents[:-1]]
+    assert metrics[-1]["duration"] is None
+
+
+def test_activity_metrics():
+    from services.audit_metrics import compute_audit_metrics
+
+    content = _audit(
+        [
+            ("form start", "", 0, ""),
+            ("question", START, 0, 60000),
+            ("form exit", "", 60000, ""),
+            ("form resume", "", 180000, ""),
+            ("question", OTHER[1], 180000, 240000),
+            ("question", END, 300000, 360000),
+        ]
+    )
+    (metrics,) = compute_audit_metrics([content], START, END)
+
+    assert metrics["duration"] == 6.0
+    assert metrics["total_time"] == 6.0
+    assert metrics["pause_time"] == 2.0
+    assert metrics["longest_gap"] == 1.0
+    assert metrics["section_times"] == {"group_intro": 1.0, "group_main": 2.0}
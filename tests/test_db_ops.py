@@ -0,0 +1,75 @@
+import asyncio
+
+
+def _record(uuid, enumerator_id="e", duration=None):
+    return {"uuid": uuid, "enumerator_Id": enumerator_id, "audit_URL": None, "interview_duration": duration}
+
+
+def _stored(records):
+    return {r["uuid"]: r["interview_duration"] for r in records}
+
+
+def test_upsert_records_splits_chunks_and_skips_existing(db):
+    from services.db_ops import get_records_page, upsert_records
+
+    async def insert_twice():
+        first = await upsert_records([_record(f"u{i}", duration=float(i)) for i in range(5)], chunk_size=2)
+        second = await upsert_records([_record(f"u{i}", duration=99.0) for i in range(3, 7)], chunk_size=3)
+        return first, second, await get_records_page(limit=100)
+
+    first, second, records = asyncio.run(insert_twice())
+
+    assert first == {"inserted": 5, "skipped": 0, "failed": 0}
+    assert second == {"inserted": 2, "skipped": 2, "failed": 0}
+    assert _stored(records) == {"u0": 0.0, "u1": 1.0, "u2": 2.0, "u3": 3.0, "u4": 4.0, "u5": 99.0, "u6": 99.0}
+
+
+def test_upsert_records_isolates_a_failing_chunk(db):
+    from services.db_ops import get_records_page, upsert_records
+    from services.enumerator_summary import get_summaries
+
+    # The NULL primary key fails the middle chunk only
+    rows = [_record("a", duration=1.0), _record("b"), _record(None), _record("c"), _record("d", duration=2.0)]
+
+    async def insert():
+        counts = await upsert_records(rows, chunk_size=2)
+        return counts, await get_records_page(limit=100), await get_summaries()
+
+    counts, records, summaries = asyncio.run(insert())
+
+    assert counts == {"inserted": 3, "skipped": 0, "failed": 2}
+    assert sorted(_stored(records)) == ["a", "b", "d"]
+    # The summary of the failed chunk was rolled back with it
+    assert summaries[0]["count"] == 3 and summaries[0]["with_duration"] == 2
+
+
+def test_upsert_records_update_overwrites_and_refreshes_summary(db):
+    from services.db_ops import get_records_page, upsert_records
+    from services.enumerator_summary import get_summaries
+
+    async def insert_and_update():
+        await upsert_records([_record("a", "e1", 10.0), _record("b", "e1", 20.0)])
+        counts = await upsert_records([_record("b", "e2", 30.0), _record("c", "e2", None)], on_conflict="update")
+        return counts, await get_records_page(limit=100), await get_summaries()
+
+    counts, records, summaries = asyncio.run(insert_and_update())
+
+    assert counts["inserted"] == 2
+    assert _stored(records) == {"a": 10.0, "b": 30.0, "c": None}
+    by_enumerator = {s["enumerator_Id"]: s for s in summaries}
+    assert (by_enumerator["e1"]["count"], by_enumerator["e1"]["max"]) == (1, 10.0)
+    assert (by_enumerator["e2"]["count"], by_enumerator["e2"]["with_duration"]) == (2, 1)
+
+
+def test_update_durations_refreshes_summary(db):
+    from services.db_ops import insert_new_records, update_durations
+    from services.enumerator_summary import get_summaries
+
+    async def insert_and_update():
+        await insert_new_records([_record("a", duration=None), _record("b", duration=40.0)])
+        await update_durations({"a": 5.0})
+        return await get_summaries()
+
+    (summary,) = asyncio.run(insert_and_update())
+
+    assert (summary["with_duration"], summary["min"], summary["short_count"]) == (2, 5.0, 1)
@@ -0,0 +1,70 @@
+import asyncio
+import sqlite3
+
+
+def _create_baseline_db(path, rows):
+    """Create the database as the pre-migration app did, with `create_all`."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE intervies (uuid VARCHAR NOT NULL, "enumerator_Id" VARCHAR, '
+        '"audit_URL" VARCHAR, interview_duration FLOAT, PRIMARY KEY (uuid))'
+    )
+    connection.execute("CREATE INDEX ix_intervies_uuid ON intervies (uuid)")
+    connection.executemany("INSERT INTO intervies VALUES (?, ?, ?, ?)", rows)
+    connection.commit()
+    connection.close()
+
+
+def test_upgrade_fills_summary_from_existing_interviews(empty_db):
+    from core.database import init_db
+    from services.db_ops import get_enumerator_stats, insert_new_records
+    from services.enumerator_summary import get_summaries
+
+    _create_baseline_db(
+        empty_db,
+        [(f"old-{i}", "old", None, duration) for i, duration in enumerate([10, 20, 30, 40, None])]
+    )
+
+    async def upgrade_and_insert():
+        await init_db()
+        await insert_new_records(
+            [{"uuid": "new-1", "enumerator_Id": "old", "audit_URL": None, "interview_duration": 5.0}]
+        )
+        return await get_summaries(), await get_enumerator_stats()
+
+    summaries, stats = asyncio.run(upgrade_and_insert())
+
+    assert len(summaries) == 1
+    summary = summaries[0]
+    assert summary["enumerator_Id"] == "old"
+    assert summary["count"] == 6 == stats[0]["count"]
+    assert summary["with_duration"] == 5
+    assert summary["mean"] == 21.0
+    assert summary["min"] == 5.0
+    assert summary["max"] == 40.0
+    assert summary["short_count"] == 2
+
+
+def test_inserts_add_to_summary_rows(db):
+    from services.db_ops import insert_new_records
+    from services.enumerator_summary import get_summaries, rebuild
+
+    def record(uuid, enumerator_id, duration):
+        return {"uuid": uuid, "enumerator_Id": enumerator_id, "audit_URL": None, "interview_duration": duration}
+
+    async def insert_and_rebuild():
+        await asyncio.gather(
+            insert_new_records([record("a1", "a", None), record("b1", "b", 30.0)]),
+            insert_new_records([record("a2", "a", 20.0), record("a3", "a", 5.0)]),
+        )
+        await insert_new_records([record("a4", "a", None), record("a2", "a", 99.0)])
+        incremental = await get_summaries()
+        await rebuild()
+        return incremental, await get_summaries()
+
+    incremental, rebuilt = asyncio.run(insert_and_rebuild())
+
+    assert incremental == rebuilt
+    a, b = incremental
+    assert (a["count"], a["with_duration"], a["min"], a["max"], a["short_count"]) == (4, 2, 5.0, 20.0, 1)
+    assert (b["count"], b["min"], b["max"]) == (1, 30.0, 30.0)
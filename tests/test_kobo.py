@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+PAGES = {"/a": b'{"results": [1]}', "/b": b'{"results": [2]}', "/big": b"x" * 64}
+
+
+@pytest.fixture
+def kobo(monkeypatch):
+    from services import kobo
+
+    monkeypatch.setattr(kobo, "KOBO_REVALIDATE_MAX_BYTES", 40)
+    yield kobo
+    asyncio.run(kobo.close_http_client())
+
+
+def _client(seen):
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        etag = f'"{request.url.path}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, headers={"ETag": etag}, content=PAGES[request.url.path])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://kobo.test")
+
+
+def _get(kobo, seen, paths):
+    async def get():
+        async with _client(seen) as client:
+            return [
+                (await kobo.get_with_retry(client, path, revalidate=True)) for path in paths
+            ]
+
+    return asyncio.run(get())
+
+
+def test_revalidated_page_is_served_from_the_kept_body(kobo):
+    seen = []
+    first, second = _get(kobo, seen, ["/a", "/a"])
+
+    assert seen == [None, '"/a"']
+    assert second.status_code == 200
+    assert second.content == first.content == PAGES["/a"]
+    assert second.headers["etag"] == '"/a"'
+
+
+def test_oversized_body_is_not_kept(kobo):
+    seen = []
+    responses = _get(kobo, seen, ["/big", "/big"])
+
+    assert seen == [None, None]
+    assert [r.content for r in responses] == [PAGES["/big"]] * 2
+    assert kobo._revalidation_bytes == 0
+
+
+def test_kept_bodies_are_bounded_least_recently_used_first(kobo, monkeypatch):
+    monkeypatch.setattr(kobo, "KOBO_REVALIDATE_MAX_BYTES", 20)
+    seen = []
+    # Only one 16-byte body fits; keeping /b evicts /a
+    _get(kobo, seen, ["/a", "/b", "/b", "/a"])
+
+    assert seen == [None, None, '"/b"', None]
+    assert list(kobo._revalidation_cache) == ["/a"]
+    assert kobo._revalidation_bytes == len(PAGES["/a"])
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import timedelta
+
+
+def test_lease_is_exclusive_until_it_expires_or_is_released(db):
+    from services.db_ops import release_lease, try_acquire_lease, utcnow
+
+    async def contend():
+        later = utcnow() + timedelta(minutes=1)
+        results = [
+            await try_acquire_lease("job", "a", later),
+            await try_acquire_lease("job", "b", later),  # a still holds it
+            await try_acquire_lease("job", "a", later + timedelta(minutes=1)),  # renewal
+        ]
+        await release_lease("job", "b")  # not the holder: no effect
+        results.append(await try_acquire_lease("job", "b", later))
+        await release_lease("job", "a")
+        results.append(await try_acquire_lease("job", "b", utcnow() - timedelta(seconds=1)))
+        # b's lease has already expired, so a takes over
+        results.append(await try_acquire_lease("job", "a", later))
+        results.append(await try_acquire_lease("other", "b", later))  # leases are independent
+        return results
+
+    assert asyncio.run(contend()) == [True, False, True, False, True, True, True]
+
+
+def test_concurrent_workers_get_one_lease(db):
+    from services.db_ops import try_acquire_lease, utcnow
+
+    async def race():
+        expires_at = utcnow() + timedelta(minutes=1)
+        return await asyncio.gather(*(try_acquire_lease("job", f"w{i}", expires_at) for i in range(5)))
+
+    assert sum(asyncio.run(race())) == 1
+
+
+def test_heartbeat_makes_this_worker_leader_and_release_steps_down(db, monkeypatch):
+    from services import lease
+
+    monkeypatch.setattr(lease, "SCHEDULER_LEASE_ENABLED", True)
+    monkeypatch.setattr(lease, "_expires_at", None)
+    calls = []
+
+    @lease.leader_only
+    async def job():
+        calls.append(1)
+        return "ran"
+
+    async def cycle():
+        results = [lease.is_leader(), await job(), await lease.heartbeat(), lease.is_leader(), await job()]
+        await lease.release()
+        results += [lease.is_leader(), await job()]
+        return results
+
+    assert asyncio.run(cycle()) == [False, None, True, True, "ran", False, None]
+    assert calls == [1]
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+
+def _limiter(max_rate=10.0, burst=10, min_rate=0.5):
+    from services.rate_limit import AdaptiveRateLimiter
+
+    return AdaptiveRateLimiter("test", max_rate, burst, min_rate)
+
+
+def test_throttled_burst_halves_the_rate_once():
+    limiter = _limiter()
+
+    async def burst():
+        return [await limiter.acquire() for _ in range(8)]
+
+    sent = asyncio.run(burst())
+    for sent_at in sent:
+        limiter.on_throttled(sent_at=sent_at)
+    assert limiter.rate == 5.0
+
+    # A request sent after the decrease starts a new congestion event
+    limiter.on_throttled(sent_at=time.monotonic())
+    assert limiter.rate == 2.5
+
+
+def test_rate_stays_between_floor_and_ceiling():
+    limiter = _limiter(max_rate=2.0, min_rate=0.5)
+    for _ in range(5):
+        limiter.on_throttled()
+    assert limiter.rate == 0.5
+
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.rate == 2.0
+
+
+def test_unlimited_until_throttled_then_halves_recent_rate():
+    limiter = _limiter(max_rate=0)
+
+    async def send(count):
+        start = time.monotonic()
+        for _ in range(count):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(send(100)) < 0.5
+    limiter.on_throttled()
+    assert limiter.rate == 50.0
+
+
+def test_retry_after_pauses_the_host():
+    limiter = _limiter()
+    limiter.on_throttled(retry_after=0.2)
+
+    async def send():
+        start = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(send()) == pytest.approx(0.2 + 1 / limiter.rate, abs=0.05)
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    from services import response_cache
+
+    app = FastAPI()
+    calls = []
+
+    @app.get("/items")
+    async def items(request: Request):
+        async def compute():
+            calls.append(request.query_params.get("page"))
+            return {"calls": len(calls)}
+
+        return await response_cache.cached_json(
+            request, compute, headers=lambda content: {"X-Calls": str(content["calls"])}
+        )
+
+    response_cache._entries.clear()
+    with TestClient(app) as client:
+        client.calls = calls
+        yield client
+    response_cache._entries.clear()
+
+
+def test_hit_is_served_without_recomputing(client):
+    first = client.get("/items?page=1")
+    second = client.get("/items?page=1")
+    other = client.get("/items?page=2")
+
+    assert first.json() == second.json() == {"calls": 1}
+    assert second.headers["X-Calls"] == "1"
+    assert other.json() == {"calls": 2}
+    assert client.calls == ["1", "2"]
+
+
+def test_bump_version_invalidates_entries(client):
+    from services.response_cache import bump_version
+
+    client.get("/items")
+    bump_version()
+
+    assert client.get("/items").json() == {"calls": 2}
+
+
+def test_matching_etag_gets_304(client):
+    etag = client.get("/items").headers["ETag"]
+
+    not_modified = client.get("/items", headers={"If-None-Match": f"W/{etag}"})
+    modified = client.get("/items", headers={"If-None-Match": '"stale"'})
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    assert modified.status_code == 200
+    assert modified.json() == {"calls": 1}